@@ -0,0 +1,315 @@
+"""Genauigkeit und Durchsatz der Bilderkennung über einen gelabelten Korpus.
+
+Der Detector aus cv2_tmm läuft über Screenshots mit Ground-Truth-Grids
+(Label-Datei <bild>.json mit 'matrix' und 'sequences' neben dem Bild) und
+über synthetische Screenshots, die aus den Templates gerendert werden
+(verschiedene Skalierungen, Hintergründe und Rauschstärken). Berichtet
+werden Latenz-Perzentile, Bilder pro Sekunde, Precision/Recall auf
+Zellebene für Matrix und Sequenzen sowie die Zeit pro Erkennungsschritt.
+Mit --min-precision/--min-recall wird der Benchmark zum Regressionstest.
+
+Zusätzlich läuft ein Warm-Szenario: synthetische Screenshots einer einzigen
+Auflösung mit wechselnden Matrixgrößen teilen sich einen Auflösungs-Cache,
+so dass das gespeicherte Panel-Layout für andere Matrizen geprüft und ggf.
+verworfen werden muss. Seine Precision/Recall zählen für die Grenzwerte mit.
+
+Zellebene: Eine erkannte Zelle ist richtig, wenn an derselben Position
+(Zeile, Spalte) im Label derselbe Code steht.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+import cv2 as cv
+import numpy as np
+
+from cv2_tmm import BreachProtocolDetector, ResolutionCache, DETECTION_MODES, get_template_bank
+from breach_batch import expand_inputs
+from breach_trace import Trace
+from bench_solver import generate_puzzle, percentile
+
+# Layout der synthetischen Screenshots bei Skalierung 1.0, nachgebildet nach
+# screenshot/screenshot.png: Leinwand, erste Matrix-Zelle und Zellabstand,
+# erste Sequenz-Zelle und Abstände im Daemon-Panel (Pixel)
+CANVAS_SIZE = (800, 518)
+MATRIX_ORIGIN = (22, 70)
+MATRIX_PITCH = 64
+SEQUENCE_ORIGIN = (629, 53)
+SEQUENCE_PITCH = (42, 60)
+# Zufällige Verschiebung jeder Zelle (Pixel bei Skalierung 1.0)
+JITTER = 2
+# Skalierungen (vgl. cv2_tmm.SCALE_PYRAMID) und Rauschstärken (Standardabweichung in Grauwerten)
+SYNTHETIC_SCALES = (0.75, 1.0, 1.33)
+NOISE_LEVELS = (0.0, 4.0, 8.0)
+# Matrixgrößen des Warm-Szenarios in Reihenfolge: erst wachsend (das Layout
+# einer kleineren Matrix schneidet die größere ab), dann schrumpfend
+WARM_MATRIX_SIZES = (5, 6, 7, 6, 5, 7)
+
+# Ein Korpus-Eintrag: (Name, Bildpfad oder Graustufen-Array, Matrix, Sequenzen)
+Sample = Tuple[str, object, List[List[str]], List[List[str]]]
+
+
+def load_labeled(inputs: List[str]) -> List[Sample]:
+    """Alle Bilder aus Verzeichnissen/Glob-Mustern, zu denen eine Label-Datei <bild>.json existiert."""
+    samples = []
+    for path in expand_inputs(inputs):
+        label_path = os.path.splitext(path)[0] + ".json"
+        if not os.path.isfile(label_path):
+            continue
+        with open(label_path, encoding="utf-8") as f:
+            label = json.load(f)
+        samples.append((path, path, label['matrix'], label['sequences']))
+    return samples
+
+
+def render_screenshot(bank, matrix: List[List[str]], sequences: List[List[str]], scale: float,
+                      noise: float, rng: random.Random, nprng: np.random.Generator) -> np.ndarray:
+    """
+    Rendert ein Graustufenbild: Templates auf einem dunklen Hintergrund mit
+    Helligkeitsverlauf, an den Zellpositionen leicht verschoben, danach
+    gaußsches Rauschen.
+    """
+    width, height = (round(size * scale) for size in CANVAS_SIZE)
+    level = rng.uniform(12, 32)
+    gradient = np.linspace(0, rng.uniform(-8, 8), width, dtype=np.float32)
+    image = np.full((height, width), level, dtype=np.float32) + gradient
+
+    templates = bank.at_scale(scale)
+    jitter = max(1, round(JITTER * scale))
+
+    def paste(kind, code, x, y):
+        template = templates.get(kind)[code]
+        x = round(x * scale) + rng.randint(-jitter, jitter)
+        y = round(y * scale) + rng.randint(-jitter, jitter)
+        h, w = template.shape
+        image[y:y + h, x:x + w] = template
+
+    for row, codes in enumerate(matrix):
+        for col, code in enumerate(codes):
+            paste("matrix", code, MATRIX_ORIGIN[0] + col * MATRIX_PITCH, MATRIX_ORIGIN[1] + row * MATRIX_PITCH)
+    for row, codes in enumerate(sequences):
+        for col, code in enumerate(codes):
+            paste("sequence", code, SEQUENCE_ORIGIN[0] + col * SEQUENCE_PITCH[0],
+                  SEQUENCE_ORIGIN[1] + row * SEQUENCE_PITCH[1])
+
+    if noise:
+        image += nprng.normal(0, noise, image.shape).astype(np.float32)
+    return np.clip(image, 0, 255).astype(np.uint8)
+
+
+def generate_synthetic(hex_images_path: str, seed: int, count: int, scales=SYNTHETIC_SCALES,
+                       noise_levels=NOISE_LEVELS) -> List[Sample]:
+    """
+    Erzeugt count Screenshots aus Puzzles von bench_solver.generate_puzzle
+    (bis 7x7, Sequenzen bis Länge 4); Skalierung und Rauschen reihum.
+    """
+    bank = get_template_bank(hex_images_path, use_cache=True)
+    rng = random.Random(seed)
+    nprng = np.random.default_rng(seed)
+    samples = []
+    for i in range(count):
+        matrix, sequences, _ = generate_puzzle(rng, 5, 7)
+        scale = scales[i % len(scales)]
+        noise = noise_levels[(i // len(scales)) % len(noise_levels)]
+        image = render_screenshot(bank, matrix, sequences, scale, noise, rng, nprng)
+        name = f"synth #{i} {len(matrix)}x{len(matrix)} s{scale} n{noise:g}"
+        samples.append((name, image, matrix, sequences))
+    return samples
+
+
+def generate_warm_scenario(hex_images_path: str, seed: int, count: int,
+                           sizes=WARM_MATRIX_SIZES) -> List[Sample]:
+    """
+    Erzeugt count Screenshots mit Skalierung 1.0 (also einer Auflösung), die
+    Matrixgrößen reihum aus sizes, das Rauschen wie bei generate_synthetic.
+    """
+    bank = get_template_bank(hex_images_path, use_cache=True)
+    rng = random.Random(seed)
+    nprng = np.random.default_rng(seed)
+    samples = []
+    for i in range(count):
+        size = sizes[i % len(sizes)]
+        matrix, sequences, _ = generate_puzzle(rng, size, size)
+        noise = NOISE_LEVELS[(i // len(sizes)) % len(NOISE_LEVELS)]
+        image = render_screenshot(bank, matrix, sequences, 1.0, noise, rng, nprng)
+        samples.append((f"warm #{i} {size}x{size} n{noise:g}", image, matrix, sequences))
+    return samples
+
+
+def save_samples(samples: List[Sample], directory: str):
+    """Schreibt synthetische Einträge als PNG mit Label-Datei, z.B. als fester Korpus."""
+    os.makedirs(directory, exist_ok=True)
+    for i, (_, image, matrix, sequences) in enumerate(samples):
+        base = os.path.join(directory, f"synthetic_{i:04d}")
+        cv.imwrite(base + ".png", image)
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({'matrix': matrix, 'sequences': sequences}, f)
+
+
+def cell_counts(predicted: Optional[List[List[str]]], truth: List[List[str]]) -> Tuple[int, int, int]:
+    """(richtige Zellen, erkannte Zellen, Zellen im Label)."""
+    predicted = predicted or []
+    correct = sum(1 for pred_row, true_row in zip(predicted, truth)
+                  for pred, true in zip(pred_row, true_row) if pred == true)
+    return correct, sum(map(len, predicted)), sum(map(len, truth))
+
+
+def run_corpus(samples: List[Sample], hex_images_path: str, options: Dict) -> Tuple[List[Dict], Trace]:
+    """
+    Erkennt jedes Bild einmal und misst die Zeit von detect_and_build_grids
+    (inkl. Laden). Ohne options['warm'] bekommt jedes Bild einen leeren
+    Auflösungs-Cache, die Kalibrierung zählt dann mit; mit warm teilen sich
+    alle Bilder einen (nicht gespeicherten) Cache wie im laufenden Betrieb.
+    """
+    bank = get_template_bank(hex_images_path, use_cache=True)
+    shared_cache = ResolutionCache()
+    trace = Trace()
+    rows = []
+    for name, image, matrix, sequences in samples:
+        detector = BreachProtocolDetector(image, hex_images_path, options['threshold'], template_bank=bank,
+                                          detection_mode=options['mode'], workers=options['workers'],
+                                          trace=trace, offset=options['offset'],
+                                          row_threshold=options['row_threshold'])
+        # Nie die resolution_cache.json des Template-Verzeichnisses verändern
+        detector.resolution_cache = shared_cache if options['warm'] else ResolutionCache()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            found_matrix, found_sequences = detector.detect_and_build_grids()
+        elapsed = (time.perf_counter() - start) * 1000
+        rows.append({
+            'image': name,
+            'ms': elapsed,
+            'matrix': cell_counts(found_matrix, matrix),
+            'sequences': cell_counts(found_sequences, sequences),
+            'exact': found_matrix == matrix and found_sequences == sequences,
+        })
+    return rows, trace
+
+
+def summarize(rows: List[Dict]) -> Dict:
+    timings = [row['ms'] for row in rows]
+    summary = {
+        'images': len(rows),
+        'exact': sum(row['exact'] for row in rows),
+        'p50_ms': percentile(timings, 50),
+        'p90_ms': percentile(timings, 90),
+        'p99_ms': percentile(timings, 99),
+        'max_ms': max(timings, default=0.0),
+        'images_per_s': len(rows) / (sum(timings) / 1000) if timings else 0.0,
+    }
+    for kind in ("matrix", "sequences"):
+        correct, predicted, truth = (sum(row[kind][i] for row in rows) for i in range(3))
+        summary[f"{kind}_precision"] = correct / predicted if predicted else 0.0
+        summary[f"{kind}_recall"] = correct / truth if truth else 0.0
+    return summary
+
+
+def print_table(rows: List[Dict], summary: Dict, trace: Trace, verbose: bool):
+    if verbose:
+        print(f"{'Bild':40} {'Zeit (ms)':>10} {'Matrix':>9} {'Sequenzen':>9}  OK")
+        for row in rows:
+            matrix = f"{row['matrix'][0]}/{row['matrix'][2]}"
+            sequences = f"{row['sequences'][0]}/{row['sequences'][2]}"
+            print(f"{row['image'][-40:]:40} {row['ms']:10.2f} {matrix:>9} {sequences:>9}  "
+                  f"{'✓' if row['exact'] else '✗'}")
+        print()
+
+    print(f"{'Bilder':>6} {'Exakt':>6} {'p50 ms':>8} {'p90 ms':>8} {'p99 ms':>8} {'max ms':>8} {'Bilder/s':>8}")
+    print(f"{summary['images']:6} {summary['exact']:6} {summary['p50_ms']:8.2f} {summary['p90_ms']:8.2f} "
+          f"{summary['p99_ms']:8.2f} {summary['max_ms']:8.2f} {summary['images_per_s']:8.1f}")
+    print()
+    print(f"{'Zellen':10} {'Precision':>9} {'Recall':>9}")
+    for kind, label in (("matrix", "Matrix"), ("sequences", "Sequenzen")):
+        print(f"{label:10} {summary[f'{kind}_precision']:9.3f} {summary[f'{kind}_recall']:9.3f}")
+    print()
+    print(trace.summary())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genauigkeit und Durchsatz der Hex-Code-Erkennung")
+    parser.add_argument("inputs", nargs="*", default=["screenshot"],
+                        help="Verzeichnisse oder Glob-Muster mit gelabelten Screenshots")
+    parser.add_argument("--hexcodes", default="hexcodes")
+    parser.add_argument("--synthetic", type=int, default=30, help="Anzahl synthetischer Screenshots")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--scales", default=",".join(map(str, SYNTHETIC_SCALES)))
+    parser.add_argument("--noise", default=",".join(f"{level:g}" for level in NOISE_LEVELS))
+    parser.add_argument("--warm-scenario", type=int, default=12,
+                        help="Anzahl Bilder des Warm-Szenarios mit gemischten Matrixgrößen (0: aus)")
+    parser.add_argument("--save-synthetic", metavar="DIR",
+                        help="Synthetische Screenshots mit Labels in dieses Verzeichnis schreiben")
+    parser.add_argument("--mode", choices=DETECTION_MODES, default="full")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--offset", type=int, default=10)
+    parser.add_argument("--row-threshold", type=float, default=15)
+    parser.add_argument("--workers", type=int, default=1, help="Worker-Threads für matchTemplate")
+    parser.add_argument("--warm", action="store_true",
+                        help="Einen Auflösungs-Cache für alle Bilder teilen (ohne Kalibrierung pro Bild)")
+    parser.add_argument("--min-precision", type=float, help="Mindest-Precision (Matrix und Sequenzen)")
+    parser.add_argument("--min-recall", type=float, help="Mindest-Recall (Matrix und Sequenzen)")
+    parser.add_argument("--json", help="Ergebnisse zusätzlich als JSON in diese Datei schreiben")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Messwerte pro Bild ausgeben")
+    args = parser.parse_args()
+
+    samples = load_labeled(args.inputs)
+    if args.synthetic:
+        synthetic = generate_synthetic(args.hexcodes, args.seed, args.synthetic,
+                                       [float(scale) for scale in args.scales.split(",")],
+                                       [float(level) for level in args.noise.split(",")])
+        if args.save_synthetic:
+            save_samples(synthetic, args.save_synthetic)
+        samples += synthetic
+    if not samples:
+        print("Keine gelabelten Bilder gefunden", file=sys.stderr)
+        sys.exit(2)
+
+    options = {
+        'mode': args.mode,
+        'threshold': args.threshold,
+        'offset': args.offset,
+        'row_threshold': args.row_threshold,
+        'workers': args.workers,
+        'warm': args.warm,
+    }
+    rows, trace = run_corpus(samples, args.hexcodes, options)
+    summary = summarize(rows)
+    print_table(rows, summary, trace, args.verbose)
+    results = {'seed': args.seed, 'options': options, 'summary': summary, 'runs': rows,
+               'stages': trace.totals()}
+    summaries = [summary]
+
+    if args.warm_scenario:
+        # Gespeichertes Panel-Layout bei wechselnden Matrixgrößen einer Auflösung
+        warm_rows, warm_trace = run_corpus(generate_warm_scenario(args.hexcodes, args.seed, args.warm_scenario),
+                                           args.hexcodes, dict(options, warm=True))
+        warm_summary = summarize(warm_rows)
+        print()
+        print("Warm-Szenario (eine Auflösung, gemischte Matrixgrößen):")
+        print_table(warm_rows, warm_summary, warm_trace, args.verbose)
+        results['warm_scenario'] = {'summary': warm_summary, 'runs': warm_rows}
+        summaries.append(warm_summary)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    # Unterschrittene Genauigkeit macht den Benchmark zum fehlschlagenden Regressionstest
+    failed = False
+    for result in summaries:
+        for kind in ("matrix", "sequences"):
+            if args.min_precision is not None and result[f"{kind}_precision"] < args.min_precision:
+                failed = True
+            if args.min_recall is not None and result[f"{kind}_recall"] < args.min_recall:
+                failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
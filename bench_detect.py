@@ -0,0 +1,78 @@
+"""Laufzeitvergleich der Bilderkennung aus cv2_tmm.
+
+Erkennt denselben Screenshot wiederholt seriell (workers=1) und mit einem
+Thread-Pool (workers=N), prüft, dass beide Pfade identische Grids liefern,
+und berichtet Laufzeit-Perzentile pro Konfiguration. Jede Konfiguration
+bekommt einen eigenen, leeren Auflösungs-Cache und einen ungemessenen
+Aufwärmlauf (Kalibrierung, Panel-Layout), gemessen wird danach im warmen
+Zustand wie im laufenden Betrieb.
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+from typing import List, Dict
+
+from cv2_tmm import BreachProtocolDetector, ResolutionCache, DETECTION_MODES, get_template_bank
+from bench_solver import percentile
+
+
+def time_detection(screenshot_path: str, hex_images_path: str, mode: str, workers: int,
+                   repeat: int, cv_threads=None) -> Dict:
+    """Erkennt den Screenshot repeat-mal und liefert Grids und Laufzeiten."""
+    bank = get_template_bank(hex_images_path, use_cache=True)
+    # Nie die resolution_cache.json des Template-Verzeichnisses verändern
+    resolution_cache = ResolutionCache()
+    timings = []
+    grids = None
+    for run in range(repeat + 1):
+        detector = BreachProtocolDetector(screenshot_path, hex_images_path, template_bank=bank,
+                                          detection_mode=mode, workers=workers, cv_threads=cv_threads)
+        detector.resolution_cache = resolution_cache
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            detector.detect_and_build_grids()
+        if run:
+            timings.append((time.perf_counter() - start) * 1000)
+        grids = (detector.get_matrix(), detector.get_sequences())
+    return {'mode': mode, 'workers': workers, 'grids': grids, 'timings': timings}
+
+
+def print_table(results: List[Dict]):
+    print(f"{'Modus':6} {'Worker':>6} {'p50 ms':>8} {'p90 ms':>8} {'min ms':>8}  OK")
+    for entry in results:
+        timings = entry['timings']
+        print(f"{entry['mode']:6} {entry['workers']:6} {percentile(timings, 50):8.2f} "
+              f"{percentile(timings, 90):8.2f} {min(timings):8.2f}  {'✓' if entry['match'] else '✗'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Hex-Code-Erkennung")
+    parser.add_argument("--screenshot", default="screenshot/screenshot.png")
+    parser.add_argument("--hexcodes", default="hexcodes")
+    parser.add_argument("--modes", default=",".join(DETECTION_MODES))
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Worker-Threads für den parallelen Lauf")
+    parser.add_argument("--cv-threads", type=int, help="cv.setNumThreads für alle Läufe")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    results = []
+    for mode in args.modes.split(","):
+        serial = time_detection(args.screenshot, args.hexcodes, mode, 1, args.repeat, args.cv_threads)
+        serial['match'] = True
+        threaded = time_detection(args.screenshot, args.hexcodes, mode, max(2, args.workers),
+                                  args.repeat, args.cv_threads)
+        threaded['match'] = threaded['grids'] == serial['grids']
+        results += [serial, threaded]
+    print_table(results)
+
+    # Abweichende Grids zwischen seriellem und parallelem Pfad sind ein Fehler
+    if not all(entry['match'] for entry in results):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,215 @@
+"""Benchmark und Regressionstest der Solver-Engines aus breach_hack.
+
+Erzeugt reproduzierbare Puzzles aus einem Seed, löst sie mit allen gewählten
+Engines, prüft, dass alle dieselbe optimale Länge liefern, und berichtet
+Knoten, Laufzeit-Perzentile und Spitzen-Speicher als Tabelle und JSON.
+"""
+import argparse
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import List, Dict
+
+from breach_hack import SOLVER_ENGINES, HEXLIST
+
+# Feste Puzzles: (Name, Matrix, Sequenzen, Buffer-Größe)
+SAMPLE_PUZZLES = [
+    ("screenshot 7x7", [
+        ['7A', '1C', '55', '1C', '55', 'BD', '1C'],
+        ['1C', 'BD', '1C', 'BD', '55', '1C', '55'],
+        ['7A', '55', 'FF', 'E9', '55', 'BD', '1C'],
+        ['FF', '1C', '1C', 'BD', '1C', 'E9', '1C'],
+        ['FF', '1C', '1C', '55', '7A', '7A', 'FF'],
+        ['55', 'BD', '1C', '55', 'E9', 'E9', '55'],
+        ['FF', 'E9', 'E9', '1C', '55', '1C', '1C'],
+    ], [['1C', 'FF'], ['1C', '55'], ['BD', '55', '1C']], 8),
+    ("5x5 unlösbar", [
+        ['55', '1C', 'BD', '55', '1C'],
+        ['1C', '55', '55', 'BD', '1C'],
+        ['BD', '1C', '55', '1C', '55'],
+        ['55', 'BD', '1C', '55', 'BD'],
+        ['1C', '55', 'BD', '1C', '55'],
+    ], [['E9', '55'], ['1C', 'BD', '55']], 6),
+    ("6x6 drei Daemons", [
+        ['E9', '1C', '55', 'BD', '7A', '1C'],
+        ['55', 'FF', '1C', 'E9', '55', 'BD'],
+        ['1C', '7A', 'BD', '55', 'FF', 'E9'],
+        ['BD', '55', 'E9', '1C', '1C', '7A'],
+        ['7A', 'E9', 'FF', '55', 'BD', '55'],
+        ['1C', 'BD', '7A', 'FF', 'E9', '1C'],
+    ], [['55', '1C'], ['E9', 'BD', '7A'], ['FF', '55', 'E9']], 8),
+]
+
+# Engines, die auch 8x8 mit Buffer 12 in vertretbarer Zeit lösen
+DEFAULT_ENGINES = ["dp", "astar"]
+
+
+def generate_puzzle(rng: random.Random, min_size: int = 5, max_size: int = 8):
+    """
+    Erzeugt ein zufälliges Puzzle wie im Spiel: Die Daemons sind meist
+    Ausschnitte eines gültigen Zugpfads durch die Matrix, manchmal rein zufällig.
+    """
+    size = rng.randint(min_size, max_size)
+    matrix = [[rng.choice(HEXLIST) for _ in range(size)] for _ in range(size)]
+    buffer_size = rng.randint(4, 12)
+
+    # Zufälliger gültiger Pfad: Start in Zeile 0, abwechselnd vertikal und horizontal
+    x, y = rng.randrange(size), 0
+    walk = [matrix[y][x]]
+    used = {(x, y)}
+    for step in range(1, buffer_size):
+        if step % 2:
+            options = [(x, ny) for ny in range(size) if (x, ny) not in used]
+        else:
+            options = [(nx, y) for nx in range(size) if (nx, y) not in used]
+        if not options:
+            break
+        x, y = rng.choice(options)
+        used.add((x, y))
+        walk.append(matrix[y][x])
+
+    sequences = []
+    for _ in range(rng.randint(1, 4)):
+        length = rng.randint(2, 4)
+        if rng.random() < 0.7 and len(walk) >= length:
+            start = rng.randrange(len(walk) - length + 1)
+            sequences.append(walk[start:start + length])
+        else:
+            sequences.append([rng.choice(HEXLIST) for _ in range(length)])
+    return matrix, sequences, buffer_size
+
+
+def generate_puzzles(seed: int, count: int, min_size: int = 5, max_size: int = 8):
+    rng = random.Random(seed)
+    puzzles = []
+    for i in range(count):
+        matrix, sequences, buffer_size = generate_puzzle(rng, min_size, max_size)
+        name = f"#{i} {len(matrix)}x{len(matrix)} b{buffer_size} d{len(sequences)}"
+        puzzles.append((name, matrix, sequences, buffer_size))
+    return puzzles
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Perzentil nach der Nearest-Rank-Methode."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+
+def compare_engines(puzzles, engines: List[str], repeat: int = 1, memory: bool = False) -> List[Dict]:
+    """Führt alle Engines auf allen Puzzles aus und misst die beste Laufzeit."""
+    rows = []
+    for name, matrix, sequences, buffer_size in puzzles:
+        reference = None
+        for engine in engines:
+            solver = SOLVER_ENGINES[engine]
+            timings = []
+            stats = {}
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = solver(matrix, sequences, buffer_size, stats=stats)
+                timings.append(time.perf_counter() - start)
+
+            peak = None
+            if memory:
+                # Eigener Lauf, damit tracemalloc die Zeitmessung nicht verfälscht
+                tracemalloc.start()
+                solver(matrix, sequences, buffer_size)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+
+            length = len(result['sequence']) if result else None
+            if engine == engines[0]:
+                reference = length
+            rows.append({
+                'puzzle': name,
+                'engine': engine,
+                'length': length,
+                'ms': min(timings) * 1000,
+                'expanded': stats.get('expanded'),
+                'peak_kb': None if peak is None else peak / 1024,
+                'match': length == reference,
+            })
+    return rows
+
+
+def summarize(rows: List[Dict], engines: List[str]) -> List[Dict]:
+    """Fasst die Messungen pro Engine zusammen."""
+    summary = []
+    for engine in engines:
+        engine_rows = [row for row in rows if row['engine'] == engine]
+        timings = [row['ms'] for row in engine_rows]
+        peaks = [row['peak_kb'] for row in engine_rows if row['peak_kb'] is not None]
+        summary.append({
+            'engine': engine,
+            'puzzles': len(engine_rows),
+            'mismatches': sum(1 for row in engine_rows if not row['match']),
+            'nodes': sum(row['expanded'] or 0 for row in engine_rows),
+            'p50_ms': percentile(timings, 50),
+            'p90_ms': percentile(timings, 90),
+            'p99_ms': percentile(timings, 99),
+            'max_ms': max(timings, default=0.0),
+            'total_ms': sum(timings),
+            'peak_kb': max(peaks) if peaks else None,
+        })
+    return summary
+
+
+def print_table(rows: List[Dict], summary: List[Dict], verbose: bool):
+    if verbose:
+        print(f"{'Puzzle':24} {'Engine':10} {'Länge':>6} {'Zeit (ms)':>10} {'Knoten':>9}  OK")
+        for row in rows:
+            print(f"{row['puzzle']:24} {row['engine']:10} {str(row['length']):>6} "
+                  f"{row['ms']:10.2f} {str(row['expanded']):>9}  {'✓' if row['match'] else '✗'}")
+        print()
+
+    print(f"{'Engine':10} {'Puzzles':>7} {'Fehler':>6} {'Knoten':>10} {'p50 ms':>8} {'p90 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'Peak KB':>8}")
+    for entry in summary:
+        peak = f"{entry['peak_kb']:8.0f}" if entry['peak_kb'] is not None else f"{'-':>8}"
+        print(f"{entry['engine']:10} {entry['puzzles']:7} {entry['mismatches']:6} {entry['nodes']:10} "
+              f"{entry['p50_ms']:8.2f} {entry['p90_ms']:8.2f} {entry['p99_ms']:8.2f} "
+              f"{entry['max_ms']:8.2f} {peak}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark der Breach-Protocol-Solver")
+    parser.add_argument("--engines", default=",".join(DEFAULT_ENGINES),
+                        help="Kommagetrennte Engines, die erste dient als Referenz "
+                             f"(verfügbar: {', '.join(SOLVER_ENGINES)})")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--count", type=int, default=50, help="Anzahl zufälliger Puzzles")
+    parser.add_argument("--min-size", type=int, default=5)
+    parser.add_argument("--max-size", type=int, default=8)
+    parser.add_argument("--samples", action="store_true", help="Nur die festen Beispiel-Puzzles verwenden")
+    parser.add_argument("--repeat", type=int, default=1)
+    parser.add_argument("--memory", action="store_true", help="Spitzen-Speicher mit tracemalloc messen")
+    parser.add_argument("--json", help="Ergebnisse zusätzlich als JSON in diese Datei schreiben")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Messwerte pro Puzzle ausgeben")
+    args = parser.parse_args()
+
+    engines = args.engines.split(",")
+    if args.samples:
+        puzzles = SAMPLE_PUZZLES
+    else:
+        puzzles = generate_puzzles(args.seed, args.count, args.min_size, args.max_size)
+
+    rows = compare_engines(puzzles, engines, args.repeat, args.memory)
+    summary = summarize(rows, engines)
+    print_table(rows, summary, args.verbose)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({'seed': args.seed, 'engines': engines, 'summary': summary, 'runs': rows}, f, indent=2)
+
+    # Abweichende optimale Längen machen den Benchmark zum fehlschlagenden Regressionstest
+    if any(entry['mismatches'] for entry in summary):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
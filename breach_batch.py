@@ -0,0 +1,142 @@
+"""Headless-Stapelverarbeitung: Screenshots erkennen und lösen, Ergebnisse als JSONL.
+
+Eingaben sind Verzeichnisse oder Glob-Muster. Jedes Bild wird in einem
+Prozess-Pool erkannt und gelöst (Templates einmal pro Worker geladen); pro
+Bild wird eine JSON-Zeile mit Grids, Lösung und Laufzeiten der einzelnen
+Schritte geschrieben, sobald das Ergebnis vorliegt.
+
+Beispiel: python breach_batch.py archiv/ "screens/**/*.png" -o ergebnisse.jsonl
+"""
+import argparse
+import contextlib
+import glob
+import io
+import json
+import multiprocessing
+import os
+import sys
+import time
+from typing import Dict, Iterator, List
+
+import cv2 as cv
+
+from cv2_tmm import detect_breach_protocol_data, get_template_bank, DETECTION_MODES
+from breach_hack import solve_breach_protocol, SOLVER_ENGINES, DEFAULT_ENGINE, BUFFER_SIZE
+from breach_trace import Trace
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp")
+
+# Einstellungen des aktuellen Worker-Prozesses, gesetzt vom Pool-Initializer
+_WORKER_OPTIONS: Dict = {}
+# Die Bilder laufen schon parallel; "parallel" bräuchte einen eigenen
+# Prozess-Pool, den die (daemonischen) Pool-Worker nicht starten dürfen
+BATCH_ENGINES = [engine for engine in SOLVER_ENGINES if engine != "parallel"]
+
+
+def expand_inputs(inputs: List[str]) -> Iterator[str]:
+    """Liefert alle Bilddateien aus Verzeichnissen (rekursiv) und Glob-Mustern, sortiert."""
+    for pattern in inputs:
+        if os.path.isdir(pattern):
+            paths = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+        else:
+            paths = glob.glob(pattern, recursive=True)
+        for path in sorted(paths):
+            if path.lower().endswith(IMAGE_EXTENSIONS) and os.path.isfile(path):
+                yield path
+
+
+def _init_worker(options: Dict):
+    global _WORKER_OPTIONS
+    _WORKER_OPTIONS = options
+    get_template_bank(options['hex_images_path'], use_cache=True)
+
+
+def process_image(path: str, options: Dict = None) -> Dict:
+    """Erkennt und löst ein Bild; Fehler landen im Feld 'error' statt abzubrechen."""
+    options = options or _WORKER_OPTIONS
+    record = {'image': path}
+    trace = Trace() if options['trace'] else None
+    timings = record['timings_ms'] = {}
+    start = time.perf_counter()
+    try:
+        image = cv.imread(path, cv.IMREAD_GRAYSCALE)
+        if image is None:
+            raise ValueError("Bild konnte nicht geladen werden")
+        loaded = time.perf_counter()
+        timings['load'] = (loaded - start) * 1000
+
+        # Die Erkennung protokolliert auf stdout, das hier für JSONL reserviert ist
+        with contextlib.redirect_stdout(sys.stderr if options['verbose'] else io.StringIO()):
+            matrix, sequences = detect_breach_protocol_data(
+                image, options['hex_images_path'], options['threshold'],
+                detection_mode=options['detection_mode'], trace=trace
+            )
+        detected = time.perf_counter()
+        timings['detect'] = (detected - loaded) * 1000
+        record['matrix'] = matrix
+        record['sequences'] = sequences
+
+        result = None
+        if matrix and sequences:
+            result = solve_breach_protocol(matrix, sequences, options['buffer_size'], options['engine'],
+                                           time_budget_ms=options['time_budget_ms'], trace=trace)
+        timings['solve'] = (time.perf_counter() - detected) * 1000
+        record['solution'] = result
+    except Exception as e:
+        record['error'] = f"{type(e).__name__}: {e}"
+    timings['total'] = (time.perf_counter() - start) * 1000
+    if trace is not None:
+        record['trace'] = trace.to_dict()
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Screenshots stapelweise erkennen und lösen (JSONL)")
+    parser.add_argument("inputs", nargs="+", help="Verzeichnisse oder Glob-Muster")
+    parser.add_argument("-o", "--output", help="JSONL-Datei (Standard: stdout)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--hexcodes", default="hexcodes")
+    parser.add_argument("--threshold", type=float, default=0.8)
+    parser.add_argument("--detection-mode", choices=DETECTION_MODES, default="full")
+    parser.add_argument("--buffer", type=int, default=BUFFER_SIZE)
+    parser.add_argument("--engine", choices=BATCH_ENGINES, default=DEFAULT_ENGINE)
+    parser.add_argument("--time-budget", type=float, help="Zeitlimit pro Lösung (ms)")
+    parser.add_argument("--trace", action="store_true", help="Spans und Solver-Zähler pro Bild ausgeben")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Erkennungs-Ausgaben auf stderr")
+    args = parser.parse_args()
+
+    options = {
+        'hex_images_path': args.hexcodes,
+        'threshold': args.threshold,
+        'detection_mode': args.detection_mode,
+        'buffer_size': args.buffer,
+        'engine': args.engine,
+        'time_budget_ms': args.time_budget,
+        'verbose': args.verbose,
+        'trace': args.trace,
+    }
+    # Template-Cache einmal im Hauptprozess anlegen, die Worker lesen ihn nur noch
+    get_template_bank(args.hexcodes, use_cache=True)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    count = errors = 0
+    start = time.perf_counter()
+    try:
+        with multiprocessing.Pool(args.workers, initializer=_init_worker, initargs=(options,)) as pool:
+            # Ergebnisse in Fertigstellungsreihenfolge streamen
+            for record in pool.imap_unordered(process_image, expand_inputs(args.inputs), chunksize=4):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                count += 1
+                errors += 'error' in record
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"{count} Bilder, {errors} Fehler, {elapsed:.1f} s ({count / elapsed if elapsed else 0:.1f} Bilder/s)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
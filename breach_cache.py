@@ -0,0 +1,152 @@
+"""Cache für Lösungen und Erkennungsergebnisse.
+
+Einträge werden über einen kanonischen Fingerabdruck (SHA-1) adressiert und
+in einem In-Memory-LRU gehalten. Optional werden sie zusätzlich als JSON-
+Dateien in einem Verzeichnis abgelegt, dessen Gesamtgröße begrenzt ist: Beim
+Überschreiten werden die am längsten nicht benutzten Dateien (mtime) gelöscht.
+"""
+import copy
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+SOLUTION_CACHE_DIR = "cache/solutions"
+DETECTION_CACHE_DIR = "cache/detections"
+# Einträge im Speicher und Gesamtgröße des Verzeichnisses
+MEMORY_ENTRIES = 256
+DISK_BYTES = 4 * 1024 * 1024
+
+
+def puzzle_fingerprint(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                       **options) -> str:
+    """
+    Kanonischer Hash eines Puzzles; options (z.B. anytime) gehören zum Schlüssel.
+    Die Codes gehen unverändert ein, da der Solver sie exakt vergleicht.
+    """
+    canonical = {
+        'matrix': [list(row) for row in matrix],
+        'sequences': [list(seq) for seq in sequences],
+        'buffer_size': buffer_size,
+        'options': options,
+    }
+    return hashlib.sha1(json.dumps(canonical, sort_keys=True).encode()).hexdigest()
+
+
+def image_fingerprint(image, **options) -> str:
+    """Hash eines Bildes (NumPy-Array oder Dateipfad) samt Erkennungs-Parametern."""
+    digest = hashlib.sha1(json.dumps(options, sort_keys=True).encode())
+    if isinstance(image, np.ndarray):
+        digest.update(str(image.shape).encode())
+        digest.update(np.ascontiguousarray(image).data)
+    else:
+        with open(image, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    LRU-Cache mit optionalem Verzeichnis als zweiter Stufe. Werte müssen als
+    JSON serialisierbar sein. stats zählt Treffer im Speicher ('memory_hits')
+    und auf der Platte ('disk_hits'), Fehlschläge, Speicherungen und
+    Verdrängungen.
+    """
+
+    def __init__(self, directory: Optional[str] = None, memory_entries: int = MEMORY_ENTRIES,
+                 disk_bytes: int = DISK_BYTES):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.entries = OrderedDict()
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.directory, key + ".json")
+
+    def _remember(self, key: str, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.memory_entries:
+            self.entries.popitem(last=False)
+
+    def get(self, key: str, default=None):
+        """Liefert eine Kopie des gespeicherten Werts oder default."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return copy.deepcopy(self.entries[key])
+        if self.directory:
+            try:
+                with open(self._file(key), "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                pass
+            else:
+                # mtime dient als Zeitpunkt der letzten Benutzung für die Verdrängung
+                os.utime(self._file(key))
+                self._remember(key, value)
+                self.stats['disk_hits'] += 1
+                return copy.deepcopy(value)
+        self.stats['misses'] += 1
+        return default
+
+    def set(self, key: str, value):
+        self._remember(key, copy.deepcopy(value))
+        self.stats['stores'] += 1
+        if self.directory:
+            with open(self._file(key), "w", encoding="utf-8") as f:
+                json.dump(value, f)
+            self.evict()
+
+    def evict(self):
+        """Löscht die ältesten Dateien, bis das Verzeichnis in disk_bytes passt."""
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.disk_bytes:
+                break
+            os.remove(path)
+            total -= size
+            self.stats['evictions'] += 1
+
+    def hit_rate(self) -> float:
+        hits = self.stats['memory_hits'] + self.stats['disk_hits']
+        lookups = hits + self.stats['misses']
+        return hits / lookups if lookups else 0.0
+
+
+class SolutionCache(ResultCache):
+    """Cache für Ergebnisse von solve_breach_protocol."""
+
+    def __init__(self, directory: Optional[str] = SOLUTION_CACHE_DIR, **kwargs):
+        super().__init__(directory, **kwargs)
+
+    def lookup(self, key: str):
+        """(True, Ergebnis) bei einem Treffer (Ergebnis kann None sein), sonst (False, None)."""
+        entry = self.get(key)
+        if entry is None:
+            return False, None
+        result = entry['result']
+        if result is not None:
+            result['path'] = [tuple(position) for position in result['path']]
+        return True, result
+
+    def store(self, key: str, result: Optional[Dict]):
+        self.set(key, {'result': result})
+
+
+class DetectionCache(ResultCache):
+    """Cache für (matrix_grid, sequence_grid) aus der Bilderkennung."""
+
+    def __init__(self, directory: Optional[str] = DETECTION_CACHE_DIR, **kwargs):
+        super().__init__(directory, **kwargs)
@@ -1,14 +1,45 @@
+import time
+START_TIME = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox
 import threading
+import queue
+from itertools import islice
 import sys
 import io
 from contextlib import redirect_stdout, redirect_stderr
 
-# Importiere deine Module
-from snipping import SnippingTool
-from cv2_tmm import detect_breach_protocol_data
-from breach_hack import solve_breach_protocol, format_solution
+# Importiere deine Module. Erkennung (OpenCV), Snipping (pyautogui) und
+# Watch-Modus werden erst bei Bedarf bzw. im Hintergrund geladen (warm_up),
+# damit das Fenster sofort erscheint.
+from breach_hack import (solve_breach_protocol, solve_buffer_range, iter_breach_solutions,
+                         format_solution, TIME_BUDGET_MS, BUFFER_SIZES)
+from breach_cache import SolutionCache, DetectionCache
+from breach_trace import Trace
+
+IMPORT_TIME_MS = (time.perf_counter() - START_TIME) * 1000
+
+# Anzahl alternativer Pfade gleicher Länge in der Zusammenfassung
+ALTERNATIVES = 3
+# Ziel für den Trace-Export (Chrome-Trace-Format, z.B. in chrome://tracing öffnen)
+TRACE_FILE = "breach.trace.json"
+# Takt, in dem die Tk-Hauptschleife die Ereignis-Queue abarbeitet (ms)
+PUMP_INTERVAL_MS = 50
+
+
+class ConsoleWriter(io.TextIOBase):
+    """stdout-Ersatz, der jede Ausgabe sofort als Konsolen-Ereignis weiterreicht"""
+    def __init__(self, gui):
+        self.gui = gui
+        
+    def writable(self):
+        return True
+        
+    def write(self, text):
+        self.gui.write_to_console(text)
+        return len(text)
+
 
 class BreachProtocolGUI:
     def __init__(self):
@@ -20,9 +51,60 @@ class BreachProtocolGUI:
         # Variables
         self.matrix_grid = None
         self.sequence_grid = None
+        # Ergebnisse für alle Buffer-Größen (solve_buffer_range) zum aktuellen Puzzle
+        self.buffer_results = None
+        # Zuletzt gewählter Bereich für den Watch-Modus
+        self.region = None
+        self.screen_size = None
+        self.watcher = None
+        # Bereits gelöste Puzzles und erkannte Screenshots werden wiederverwendet
+        self.solution_cache = SolutionCache()
+        self.detection_cache = DetectionCache()
+        # Worker-Threads greifen nie direkt auf Tk zu, sondern legen Ereignisse
+        # in die Queue, die pump_events im Tk-Thread abarbeitet
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
         
         self.setup_ui()
         
+    def warm_up(self):
+        """
+        Lädt die schweren Module und die Templates im Hintergrund vor und meldet
+        die Ladezeiten. Jeder Schritt für sich: Fehlt z.B. ein Display für
+        pyautogui, sind die Templates trotzdem geladen.
+        """
+        def load_detection():
+            import cv2_tmm
+
+        def load_templates():
+            import cv2_tmm
+            cv2_tmm.get_template_bank("hexcodes", use_cache=True)
+
+        def load_capture():
+            import pyautogui, snipping, breach_watch
+
+        timings = []
+        steps = (("OpenCV/Erkennung", load_detection), ("Templates", load_templates),
+                 ("Snipping/Watch-Modus", load_capture))
+        for name, step in steps:
+            start = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.write_to_console(f"⚠️ Vorladen fehlgeschlagen ({name}): {e}\n")
+                continue
+            timings.append((name, time.perf_counter() - start))
+        
+        if timings:
+            details = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in timings)
+            self.write_to_console(f"⚡ Vorgeladen: {details}\n")
+        
+    def on_first_frame(self):
+        """Meldet die Startzeit bis zum ersten gezeichneten Fenster und startet das Vorladen"""
+        ready_ms = (time.perf_counter() - START_TIME) * 1000
+        self.write_to_console(f"⚡ Fenster bereit nach {ready_ms:.0f} ms (Importe {IMPORT_TIME_MS:.0f} ms)\n")
+        threading.Thread(target=self.warm_up, daemon=True).start()
+        
     def setup_ui(self):
         # Main frame
         main_frame = ttk.Frame(self.root, padding="10")
@@ -47,15 +129,30 @@ class BreachProtocolGUI:
         # Buffer size setting
         ttk.Label(settings_frame, text="Buffer Größe:").grid(row=0, column=0, padx=(0, 5), sticky=tk.W)
         self.buffer_var = tk.StringVar(value="8")
-        buffer_spinbox = ttk.Spinbox(settings_frame, from_=4, to=12, width=10, 
+        buffer_spinbox = ttk.Spinbox(settings_frame, from_=BUFFER_SIZES[0], to=BUFFER_SIZES[-1], width=10, 
                                    textvariable=self.buffer_var, state="readonly")
+        self.buffer_var.trace_add("write", self.on_buffer_change)
         buffer_spinbox.grid(row=0, column=1, padx=(0, 10), sticky=tk.W)
         
+        # Time budget setting
+        ttk.Label(settings_frame, text="Zeitlimit (ms):").grid(row=1, column=0, padx=(0, 5), pady=(5, 0), sticky=tk.W)
+        self.budget_var = tk.StringVar(value=str(TIME_BUDGET_MS))
+        budget_spinbox = ttk.Spinbox(settings_frame, from_=100, to=10000, increment=100, width=10,
+                                   textvariable=self.budget_var)
+        budget_spinbox.grid(row=1, column=1, padx=(0, 10), pady=(5, 0), sticky=tk.W)
+        
+        # Trace export setting
+        self.trace_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(settings_frame, text=f"Trace nach {TRACE_FILE} exportieren",
+                        variable=self.trace_var).grid(row=2, column=0, columnspan=2, pady=(5, 0), sticky=tk.W)
+        
         # Button frame
         button_frame = ttk.Frame(main_frame)
         button_frame.grid(row=2, column=0, pady=(0, 10), sticky=(tk.W, tk.E))
         button_frame.columnconfigure(0, weight=1)
         button_frame.columnconfigure(1, weight=1)
+        button_frame.columnconfigure(2, weight=1)
+        button_frame.columnconfigure(3, weight=1)
         
         # Buttons
         self.main_btn = ttk.Button(button_frame, text="🚀 Screenshot & Lösen", 
@@ -64,7 +161,15 @@ class BreachProtocolGUI:
         
         self.reset_btn = ttk.Button(button_frame, text="🔄 Zurücksetzen", 
                                    command=self.reset_process)
-        self.reset_btn.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        self.reset_btn.grid(row=0, column=1, padx=(0, 10), sticky=(tk.W, tk.E))
+        
+        self.watch_btn = ttk.Button(button_frame, text="👁️ Watch-Modus starten", 
+                                   command=self.toggle_watch)
+        self.watch_btn.grid(row=0, column=2, padx=(0, 10), sticky=(tk.W, tk.E))
+        
+        self.cancel_btn = ttk.Button(button_frame, text="⛔ Abbrechen", 
+                                    command=self.cancel_process, state="disabled")
+        self.cancel_btn.grid(row=0, column=3, sticky=(tk.W, tk.E))
         
         # Console output frame
         console_frame = ttk.LabelFrame(main_frame, text="Konsolen-Ausgabe", padding="5")
@@ -95,46 +200,109 @@ class BreachProtocolGUI:
         self.write_to_console("=== Breach Protocol Solver gestartet ===\n")
         self.write_to_console("1. Stelle die gewünschte Buffer-Größe ein (Standard: 8)\n")
         self.write_to_console("2. Klicke auf 'Screenshot & Lösen' um den kompletten Prozess zu starten\n")
-        self.write_to_console("3. Wähle den Bereich aus und das Programm löst automatisch das Puzzle\n\n")
+        self.write_to_console("3. Wähle den Bereich aus und das Programm löst automatisch das Puzzle\n")
+        self.write_to_console("4. Optional: 'Watch-Modus' beobachtet den Bereich und löst neue Puzzles automatisch\n\n")
         
     def write_to_console(self, text):
-        """Schreibt Text in die Konsole"""
-        self.console_text.insert(tk.END, text)
-        self.console_text.see(tk.END)
-        self.root.update_idletasks()
+        """Schreibt Text in die Konsole (aus jedem Thread)"""
+        self.events.put(("console", text))
         
     def clear_console(self):
         """Leert die Konsole"""
         self.console_text.delete(1.0, tk.END)
         
     def update_status(self, text):
-        """Aktualisiert die Statusleiste"""
-        self.status_var.set(text)
-        self.root.update_idletasks()
+        """Aktualisiert die Statusleiste (aus jedem Thread)"""
+        self.events.put(("status", text))
+        
+    def report_progress(self, progress):
+        """Fortschritt des Solvers (SearchBudget.progress), nur die neueste Meldung wird angezeigt"""
+        self.events.put(("progress", progress))
+        
+    def run_on_ui(self, func, *args, **kwargs):
+        """Führt func im Tk-Thread aus"""
+        self.events.put(("call", (func, args, kwargs)))
+        
+    def pump_events(self):
+        """Arbeitet alle wartenden Ereignisse ab, Konsolentext wird gesammelt eingefügt"""
+        console = []
+        
+        def flush_console():
+            if console:
+                self.console_text.insert(tk.END, "".join(console))
+                self.console_text.see(tk.END)
+                console.clear()
+        
+        progress = None
+        while True:
+            try:
+                kind, payload = self.events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "console":
+                console.append(payload)
+            elif kind == "status":
+                self.status_var.set(payload)
+                progress = None
+            elif kind == "progress":
+                progress = payload
+            elif kind == "call":
+                # Reihenfolge zur Konsole erhalten (z.B. Dialog nach der Ausgabe)
+                flush_console()
+                func, args, kwargs = payload
+                func(*args, **kwargs)
+        flush_console()
+        if progress is not None:
+            best = progress['best_len'] if progress['best_len'] is not None else "-"
+            self.status_var.set(f"Löse Puzzle... {progress['nodes']:,} Knoten, "
+                                f"{progress['nodes_per_s']:,.0f} Knoten/s, beste Länge {best}")
+        self.root.after(PUMP_INTERVAL_MS, self.pump_events)
+        
+    def cancel_process(self):
+        """Bricht den laufenden Prozess beim nächsten Zwischenschritt bzw. die Suche sofort ab"""
+        self.cancel_event.set()
+        self.cancel_btn.config(state="disabled")
+        self.write_to_console("⛔ Abbruch angefordert...\n")
+        
+    def show_window(self):
+        self.root.deiconify()
+        self.root.lift()
+        
+    def finish_process(self):
+        """Setzt die Buttons nach dem Prozess zurück (Tk-Thread)"""
+        self.main_btn.config(state="normal")
+        self.cancel_btn.config(state="disabled")
         
     def run_full_process(self):
         """Führt den kompletten Prozess aus: Screenshot -> Analyse -> Lösung"""
         def full_process():
             try:
+                # Bereits geladen, falls warm_up fertig ist
+                from snipping import SnippingTool
+                from cv2_tmm import detect_breach_protocol_data
+                
                 # Schritt 1: Screenshot
                 self.update_status("Screenshot-Modus aktiv - Wähle einen Bereich aus")
                 self.write_to_console("\n🚀 KOMPLETTER PROZESS GESTARTET\n")
                 self.write_to_console("="*50 + "\n")
                 self.write_to_console("📷 Schritt 1/3: Screenshot aufnehmen...\n")
-                
-                # Deaktiviere Button während des Prozesses
-                self.main_btn.config(state="disabled")
-                
-                # Minimiere das Hauptfenster
-                self.root.withdraw()
+                trace = Trace()
                 
                 # Starte Snipping Tool
                 snipping_tool = SnippingTool()
-                snipping_tool.run()
+                frame = snipping_tool.run()
                 
                 # Stelle das Hauptfenster wieder her
-                self.root.deiconify()
-                self.root.lift()
+                self.run_on_ui(self.show_window)
+                
+                if frame is None or frame.size == 0:
+                    self.write_to_console("❌ Kein Bereich ausgewählt!\n")
+                    self.update_status("Screenshot abgebrochen")
+                    return
+                self.region = snipping_tool.region
+                if snipping_tool.capture_span is not None:
+                    trace.add_span("capture", *snipping_tool.capture_span)
+                self.screen_size = snipping_tool.screen_size
                 
                 self.write_to_console("✅ Screenshot erfolgreich aufgenommen!\n\n")
                 
@@ -142,22 +310,25 @@ class BreachProtocolGUI:
                 self.update_status("Analysiere Screenshot...")
                 self.write_to_console("🔍 Schritt 2/3: Analysiere Screenshot...\n")
                 
-                # Capture stdout/stderr für die Konsole
-                console_output = io.StringIO()
+                # Ausgaben des Detectors laufend in die Konsole leiten
+                console_output = ConsoleWriter(self)
                 
                 with redirect_stdout(console_output), redirect_stderr(console_output):
-                    # Erkenne Matrix und Sequenzen
+                    # Erkenne Matrix und Sequenzen direkt im aufgenommenen Frame
                     self.matrix_grid, self.sequence_grid = detect_breach_protocol_data(
-                        screenshot_path='screenshot/screenshot.png',
+                        screenshot_path=frame,
                         hex_images_path="hexcodes",
                         threshold=0.8,
-                        visualize=False
+                        visualize=False,
+                        screen_size=snipping_tool.screen_size,
+                        cache=self.detection_cache,
+                        trace=trace
                     )
                 
-                # Zeige die gesammelten Ausgaben
-                output = console_output.getvalue()
-                if output:
-                    self.write_to_console(output)
+                if self.cancel_event.is_set():
+                    self.write_to_console("⛔ Prozess abgebrochen\n")
+                    self.update_status("Abgebrochen")
+                    return
                 
                 if not self.matrix_grid or not self.sequence_grid:
                     self.write_to_console("❌ Keine Matrix oder Sequenzen erkannt!\n")
@@ -165,7 +336,7 @@ class BreachProtocolGUI:
                     self.write_to_console("- Der Screenshot den richtigen Bereich zeigt\n")
                     self.write_to_console("- Die Hex-Templates vorhanden sind\n")
                     self.update_status("Analyse fehlgeschlagen")
-                    messagebox.showerror("Analysefehler", "Keine Matrix oder Sequenzen erkannt!")
+                    self.run_on_ui(messagebox.showerror, "Analysefehler", "Keine Matrix oder Sequenzen erkannt!")
                     return
                 
                 self.write_to_console(f"✅ Matrix erkannt: {len(self.matrix_grid)} x {len(self.matrix_grid[0])}\n")
@@ -191,11 +362,63 @@ class BreachProtocolGUI:
                     buffer_size = 8
                     self.write_to_console(f"⚠️ Ungültige Buffer-Größe, verwende Standard: {buffer_size}\n")
                 
+                try:
+                    time_budget_ms = int(self.budget_var.get())
+                except ValueError:
+                    time_budget_ms = TIME_BUDGET_MS
+                    self.write_to_console(f"⚠️ Ungültiges Zeitlimit, verwende Standard: {time_budget_ms} ms\n")
+                
                 self.write_to_console(f"Buffer-Größe: {buffer_size}\n")
-                result = solve_breach_protocol(self.matrix_grid, self.sequence_grid, buffer_size)
+                self.write_to_console(f"Zeitlimit: {time_budget_ms} ms\n")
+                # Das Zeitlimit gilt für alle Suchen zusammen, jede bekommt nur die Restzeit
+                deadline = time.perf_counter() + time_budget_ms / 1000
+
+                def remaining_ms():
+                    return max(0.0, (deadline - time.perf_counter()) * 1000)
+
+                # Eine Suche beim größten Buffer liefert die Ergebnisse für alle Buffer-Größen
+                solve_stats = {}
+                self.buffer_results = solve_buffer_range(self.matrix_grid, self.sequence_grid,
+                                                         time_budget_ms=remaining_ms(), stats=solve_stats,
+                                                         cache=self.solution_cache, trace=trace,
+                                                         cancel=self.cancel_event, progress=self.report_progress)
+                if solve_stats.get('cancelled'):
+                    self.write_to_console("⛔ Suche abgebrochen\n")
+                    self.update_status("Abgebrochen")
+                    return
+                unreachable = solve_stats.get('preprocess', {}).get('unreachable')
+                if unreachable:
+                    self.write_to_console("⚠️ Nicht erreichbare Sequenzen (Symbol fehlt in der Matrix "
+                                          "oder länger als der Buffer):\n")
+                    for seq in unreachable:
+                        self.write_to_console(f"   {' '.join(seq)}\n")
+                if solve_stats.get('cache') == "hit":
+                    self.write_to_console(f"♻️ Lösung aus dem Cache (Trefferquote "
+                                          f"{self.solution_cache.hit_rate():.0%})\n")
+                min_buffer = self.buffer_results['min_buffer']
+                if min_buffer is not None:
+                    self.write_to_console(f"Minimale Buffer-Größe: {min_buffer}\n")
+                
+                result = self.buffer_results['results'].get(buffer_size)
+                if result is None:
+                    # Keine vollständige Lösung mit diesem Buffer: beste Teil-Lösung suchen
+                    result = solve_breach_protocol(self.matrix_grid, self.sequence_grid, buffer_size,
+                                                   time_budget_ms=remaining_ms(), anytime=True,
+                                                   cache=self.solution_cache, trace=trace,
+                                                   cancel=self.cancel_event, progress=self.report_progress)
+                
+                self.write_to_console("\n⏱️ Laufzeiten:\n" + trace.summary() + "\n\n")
+                if self.trace_var.get():
+                    trace.export(TRACE_FILE)
+                    self.write_to_console(f"Trace gespeichert: {TRACE_FILE}\n\n")
                 
                 if result:
-                    self.write_to_console("🎉 LÖSUNG GEFUNDEN! 🎉\n\n")
+                    if len(result['covered_sequences']) < len(self.sequence_grid):
+                        self.write_to_console("⚠️ Nicht alle Sequenzen abdeckbar - beste Teil-Lösung:\n\n")
+                    else:
+                        self.write_to_console("🎉 LÖSUNG GEFUNDEN! 🎉\n\n")
+                    if not result['optimal']:
+                        self.write_to_console("⏱️ Zeitlimit erreicht - Optimalität nicht bewiesen\n\n")
                     solution_text = format_solution(result, self.matrix_grid)
                     self.write_to_console(solution_text)
                     self.write_to_console("\n" + "="*50 + "\n")
@@ -208,12 +431,23 @@ class BreachProtocolGUI:
                     self.write_to_console(f"Eingabe-Sequenz: {sequence_str}\n")
                     self.write_to_console(f"Pfad: {path_str}\n")
                     self.write_to_console(f"Abgedeckte Sequenzen: {len(result['covered_sequences'])}/{len(self.sequence_grid)}\n")
+                    
+                    # Gleich lange Alternativen, falls der erste Pfad schwer einzugeben ist
+                    if len(result['covered_sequences']) == len(self.sequence_grid):
+                        solutions = iter_breach_solutions(self.matrix_grid, self.sequence_grid,
+                                                          len(result['sequence']), time_budget_ms=remaining_ms(),
+                                                          cancel=self.cancel_event)
+                        alternatives = [alt for alt in islice(solutions, ALTERNATIVES + 1)
+                                        if alt['path'] != result['path']][:ALTERNATIVES]
+                        for i, alt in enumerate(alternatives, 1):
+                            alt_path = ' -> '.join([f"({x},{y})" for x, y in alt['path']])
+                            self.write_to_console(f"Alternative {i}: {alt_path}\n")
                     self.write_to_console(f"\n🏆 PROZESS ERFOLGREICH ABGESCHLOSSEN! 🏆\n")
                     
                     self.update_status("✅ Puzzle erfolgreich gelöst!")
                     
                     # Zeige Erfolgs-Dialog
-                    messagebox.showinfo("Lösung gefunden!", 
+                    self.run_on_ui(messagebox.showinfo, "Lösung gefunden!", 
                                       f"Das Puzzle wurde automatisch gelöst!\n\n"
                                       f"Sequenz: {sequence_str}\n"
                                       f"Schritte: {len(result['sequence'])}\n"
@@ -222,26 +456,103 @@ class BreachProtocolGUI:
                     self.write_to_console("❌ Keine Lösung gefunden!\n")
                     self.write_to_console("Das Puzzle kann mit den gegebenen Parametern nicht gelöst werden.\n")
                     self.update_status("❌ Keine Lösung gefunden")
-                    messagebox.showwarning("Keine Lösung", "Das Puzzle konnte nicht gelöst werden.")
+                    self.run_on_ui(messagebox.showwarning, "Keine Lösung", "Das Puzzle konnte nicht gelöst werden.")
                     
             except Exception as e:
                 error_msg = f"❌ Fehler im Prozess: {str(e)}\n"
                 self.write_to_console(error_msg)
                 self.update_status("❌ Prozess-Fehler")
-                messagebox.showerror("Prozess-Fehler", str(e))
+                self.run_on_ui(messagebox.showerror, "Prozess-Fehler", str(e))
                 # Stelle das Hauptfenster wieder her falls ein Fehler auftritt
-                self.root.deiconify()
+                self.run_on_ui(self.show_window)
             finally:
                 # Aktiviere Button wieder
-                self.main_btn.config(state="normal")
+                self.run_on_ui(self.finish_process)
+        
+        # Buttons umschalten und Hauptfenster minimieren, solange wir im Tk-Thread sind
+        self.cancel_event.clear()
+        self.main_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
+        self.root.withdraw()
         
         # Starte in separatem Thread
         threading.Thread(target=full_process, daemon=True).start()
         
+    def on_buffer_change(self, *args):
+        """Zeigt nach einem Wechsel der Buffer-Größe das bereits berechnete Ergebnis ohne neue Suche"""
+        if self.buffer_results is None:
+            return
+        buffer_size = int(self.buffer_var.get())
+        result = self.buffer_results['results'].get(buffer_size)
+        min_buffer = self.buffer_results['min_buffer']
+        if result is not None:
+            self.write_to_console(f"\n📏 Buffer {buffer_size}: Lösung mit {len(result['sequence'])} Schritten\n")
+            self.write_to_console(format_solution(result, self.matrix_grid) + "\n")
+        elif min_buffer is not None:
+            self.write_to_console(f"\n📏 Buffer {buffer_size}: keine vollständige Lösung "
+                                  f"(mindestens {min_buffer} nötig)\n")
+        else:
+            self.write_to_console(f"\n📏 Buffer {buffer_size}: keine vollständige Lösung\n")
+        
+    def read_settings(self):
+        """Liest Buffer-Größe und Zeitlimit, ungültige Eingaben fallen auf die Standardwerte zurück"""
+        try:
+            buffer_size = int(self.buffer_var.get())
+        except ValueError:
+            buffer_size = 8
+        try:
+            time_budget_ms = int(self.budget_var.get())
+        except ValueError:
+            time_budget_ms = TIME_BUDGET_MS
+        return buffer_size, time_budget_ms
+        
+    def toggle_watch(self):
+        """Startet oder stoppt den Watch-Modus für den zuletzt gewählten Bereich"""
+        if self.watcher is not None:
+            self.watcher.stop()
+            stats = self.watcher.stats
+            self.watcher = None
+            self.watch_btn.config(text="👁️ Watch-Modus starten")
+            self.main_btn.config(state="normal")
+            self.write_to_console(f"⏹️ Watch-Modus beendet ({stats['frames']} Frames, "
+                                  f"{stats['detections']} Erkennungen, {stats['solves']} Lösungen)\n")
+            self.update_status("Bereit")
+            return
+        
+        if self.region is None:
+            messagebox.showinfo("Watch-Modus", "Bitte zuerst 'Screenshot & Lösen' ausführen, "
+                                               "um den Bereich festzulegen.")
+            return
+        
+        from breach_watch import BreachWatcher
+        buffer_size, time_budget_ms = self.read_settings()
+        self.watcher = BreachWatcher(self.region, self.on_watch_solution, buffer_size, time_budget_ms,
+                                     screen_size=self.screen_size, cache=self.solution_cache)
+        threading.Thread(target=self.watcher.run, daemon=True).start()
+        self.watch_btn.config(text="⏹️ Watch-Modus stoppen")
+        self.main_btn.config(state="disabled")
+        self.write_to_console(f"\n👁️ Watch-Modus gestartet - beobachte Bereich {self.region}\n")
+        self.update_status("Watch-Modus aktiv - warte auf Breach Protocol")
+        
+    def on_watch_solution(self, matrix, sequences, result):
+        """Wird vom Watch-Modus für jedes neu erkannte Puzzle aufgerufen"""
+        self.matrix_grid, self.sequence_grid = matrix, sequences
+        self.buffer_results = None
+        self.write_to_console("\n🔍 Neues Puzzle erkannt\n")
+        if result:
+            if not result['optimal']:
+                self.write_to_console("⏱️ Zeitlimit erreicht - Optimalität nicht bewiesen\n")
+            self.write_to_console(format_solution(result, matrix) + "\n")
+            self.update_status("✅ Watch-Modus: Puzzle gelöst")
+        else:
+            self.write_to_console("❌ Keine Lösung gefunden!\n")
+            self.update_status("❌ Watch-Modus: Keine Lösung gefunden")
+        
     def reset_process(self):
         """Setzt den Prozess zurück"""
         self.matrix_grid = None
         self.sequence_grid = None
+        self.buffer_results = None
         self.clear_console()
         self.write_to_console("=== Breach Protocol Solver zurückgesetzt ===\n")
         self.write_to_console("Bereit für einen neuen Durchlauf.\n\n")
@@ -250,6 +561,8 @@ class BreachProtocolGUI:
         
     def run(self):
         """Startet die GUI"""
+        self.root.after_idle(self.on_first_frame)
+        self.root.after(PUMP_INTERVAL_MS, self.pump_events)
         self.root.mainloop()
 
 if __name__ == "__main__":
@@ -1,15 +1,26 @@
-from typing import List, Tuple, Dict
+from typing import Callable, List, Tuple, Dict, Optional
 import numpy as np
-# Import des Breach Protocol Detectors
-from cv2_tmm import detect_breach_protocol_data
+from breach_solver import (solve_bitmask, solve_automaton, solve_dp, solve_astar, solve_frontier,
+                           iter_solutions, SearchBudget, solve_within_budget, preprocess_puzzle,
+                           contains_sequence)
+from breach_parallel import solve_parallel
+from breach_cache import SolutionCache, puzzle_fingerprint
+from breach_trace import Trace
 
 # Konstanten
 HEXLIST = ["55", "1C", "BD", "E9", "7A", "FF"]
 BUFFER_SIZE = 8
+# Im Spiel mögliche Buffer-Größen
+BUFFER_SIZES = range(4, 13)
+DEFAULT_ENGINE = "dp"
+TIME_BUDGET_MS = 1000
 
-def solve_breach_protocol(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int) -> Dict:
+def solve_backtrack(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                    stats: Optional[Dict] = None) -> Dict:
+    """Ursprünglicher Backtracker (Referenz-Implementierung)."""
     y_len, x_len = len(matrix), len(matrix[0])
     best_solution = None
+    expanded = 0
     target_sequences = len(sequences)
 
     def contains_sequence(main: List[str], sub: List[str]) -> bool:
@@ -25,7 +36,7 @@ def solve_breach_protocol(matrix: List[List[str]], sequences: List[List[str]], b
 
     def backtrack(path: List[str], positions: List[Tuple[int, int]], used: List[List[bool]], 
                   step: int, current_x: int, current_y: int, move_horizontal: bool):
-        nonlocal best_solution
+        nonlocal best_solution, expanded
         
         # Prüfe, ob alle Sequenzen abgedeckt sind
         covered_count = count_covered_sequences(path)
@@ -48,6 +59,7 @@ def solve_breach_protocol(matrix: List[List[str]], sequences: List[List[str]], b
         if best_solution and len(path) >= len(best_solution['sequence']):
             return
 
+        expanded += 1
         if move_horizontal:
             # Bewege dich horizontal (y bleibt gleich, x ändert sich)
             for new_x in range(x_len):
@@ -79,8 +91,153 @@ def solve_breach_protocol(matrix: List[List[str]], sequences: List[List[str]], b
         # Nach dem ersten Schritt bewegen wir uns vertikal (move_horizontal = False)
         backtrack(path, positions, used, 1, start_col, 0, False)
 
+    if stats is not None:
+        stats['expanded'] = expanded
     return best_solution
 
+# Verfügbare Solver-Engines, alle mit identischem Ergebnisformat
+SOLVER_ENGINES = {
+    "backtrack": solve_backtrack,
+    "bitmask": solve_bitmask,
+    "automaton": solve_automaton,
+    "dp": solve_dp,
+    "astar": solve_astar,
+    "frontier": solve_frontier,
+    "parallel": solve_parallel,
+}
+
+def solve_breach_protocol(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                          engine: str = DEFAULT_ENGINE, stats: Optional[Dict] = None,
+                          time_budget_ms: Optional[float] = None, anytime: bool = False,
+                          cache: Optional[SolutionCache] = None, trace: Optional[Trace] = None,
+                          cancel=None, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Löst das Breach Protocol mit der gewählten Engine.
+    Wird ein stats-Dict übergeben, trägt die Engine dort ihre Zähler ein:
+    expandierte Knoten ('expanded'), abgeschnittene Teilbäume ('prunes'),
+    maximale Pfadlänge ('max_depth') und Automaten-Übergänge
+    ('coverage_checks'); 'backtrack' und 'parallel' nur 'expanded'. Mit
+    trace wird die Suche als Span "solve" aufgezeichnet und die Zähler als
+    "solver.*" übernommen.
+
+    Mit time_budget_ms bricht die Suche nach Ablauf des Budgets ab und liefert
+    die bis dahin beste Lösung. Mit anytime=True wird statt None die beste
+    Teil-Lösung (meiste Sequenzen, dann kürzester Pfad) geliefert. In beiden
+    Fällen enthält das Ergebnis 'optimal' (True, wenn die Suche vollständig war).
+    Ein gesetztes cancel-Event (threading.Event) beendet die Suche ebenso
+    vorzeitig (stats['cancelled']), progress erhält laufend Knotenzahl,
+    Knoten pro Sekunde und die beste bisherige Länge (siehe SearchBudget).
+
+    Mit cache werden vollständig berechnete Ergebnisse unter dem Fingerabdruck
+    des Puzzles gespeichert und bei der nächsten Anfrage direkt geliefert;
+    stats['cache'] ist dann 'hit' bzw. 'miss'. Bei einer Suche mit Zeitbudget
+    gibt stats['expired'] an, ob das Budget abgelaufen ist.
+
+    Vor der Suche läuft preprocess_puzzle: Ohne anytime liefert ein sicher
+    unlösbares Puzzle sofort None und gesucht wird nur nach den nicht
+    redundanten Daemons, mit anytime entfallen nur die unerreichbaren.
+    stats['preprocess'] nennt die entfallenen und unerreichbaren Daemons und
+    die minimale Länge.
+    """
+    if engine not in SOLVER_ENGINES:
+        raise ValueError(f"Unbekannte Solver-Engine: {engine} (verfügbar: {', '.join(SOLVER_ENGINES)})")
+    budgeted = time_budget_ms is not None or anytime or cancel is not None or progress is not None
+    if engine == "backtrack" and budgeted:
+        raise ValueError("Die Engine 'backtrack' unterstützt kein Zeitbudget")
+    if trace is not None:
+        stats = {} if stats is None else stats
+        with trace.span("solve", engine=engine, buffer_size=buffer_size):
+            result = solve_breach_protocol(matrix, sequences, buffer_size, engine, stats,
+                                           time_budget_ms, anytime, cache, cancel=cancel, progress=progress)
+        trace.update(stats, prefix="solver.")
+        return result
+
+    prepared = preprocess_puzzle(matrix, sequences, buffer_size)
+    if stats is not None:
+        stats['preprocess'] = {name: prepared[name] for name in ('redundant', 'unreachable', 'min_length')}
+    if not anytime and not prepared['feasible']:
+        if stats is not None:
+            stats['expanded'] = 0
+        return None
+    # Redundante Daemons zählen bei Teil-Lösungen mit und bleiben dann erhalten
+    targets = prepared['reachable'] if anytime else prepared['sequences']
+
+    key = None
+    if cache is not None:
+        # Alle Engines liefern dieselbe Lösung, nur anytime ändert das Ergebnis
+        key = puzzle_fingerprint(matrix, sequences, buffer_size, anytime=anytime)
+        hit, result = cache.lookup(key)
+        if stats is not None:
+            stats['cache'] = "hit" if hit else "miss"
+        if hit:
+            if result is not None and (time_budget_ms is not None or anytime):
+                result['optimal'] = True
+            return result
+
+    if anytime and not targets:
+        # anytime ohne erreichbaren Daemon: keine Teil-Lösung möglich
+        result = None
+        complete = True
+    elif not budgeted:
+        result = SOLVER_ENGINES[engine](matrix, targets, buffer_size, stats=stats)
+        complete = True
+    else:
+        budget = SearchBudget(time_budget_ms, anytime, cancel=cancel, progress=progress)
+        result = solve_within_budget(SOLVER_ENGINES[engine], matrix, targets, buffer_size, budget,
+                                     stats=stats)
+        # Abgebrochene Suchen sind nicht bewiesen und werden nicht gespeichert
+        complete = not budget.expired
+        if stats is not None:
+            stats['expired'] = budget.expired
+            stats['cancelled'] = budget.cancelled
+    if result is not None:
+        result['covered_sequences'] = [seq for seq in sequences if contains_sequence(result['sequence'], seq)]
+
+    if key is not None and complete:
+        # 'optimal' hängt vom Aufruf ab und wird beim Treffer neu gesetzt
+        cache.store(key, None if result is None else {k: v for k, v in result.items() if k != 'optimal'})
+    return result
+
+def iter_breach_solutions(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                          stats: Optional[Dict] = None, time_budget_ms: Optional[float] = None,
+                          cancel=None):
+    """
+    Liefert lazy alle Lösungen in nichtfallender Länge: zuerst die von
+    solve_breach_protocol, dann gleich lange Alternativen und danach längere.
+    Gesucht wird nur so weit, wie iteriert wird, z.B. die drei besten mit
+    itertools.islice(iter_breach_solutions(...), 3). Mit time_budget_ms endet
+    der Generator nach Ablauf des Budgets oder einem gesetzten cancel-Event.
+    """
+    budget = None
+    if time_budget_ms is not None or cancel is not None:
+        budget = SearchBudget(time_budget_ms, cancel=cancel)
+    return iter_solutions(matrix, sequences, buffer_size, stats=stats, budget=budget)
+
+def solve_buffer_range(matrix: List[List[str]], sequences: List[List[str]], buffer_sizes=BUFFER_SIZES,
+                       engine: str = DEFAULT_ENGINE, stats: Optional[Dict] = None,
+                       time_budget_ms: Optional[float] = None,
+                       cache: Optional[SolutionCache] = None, trace: Optional[Trace] = None,
+                       cancel=None, progress: Optional[Callable[[Dict], None]] = None) -> Dict:
+    """
+    Optimale Ergebnisse für alle Buffer-Größen mit einer einzigen Suche beim
+    größten Buffer: Die kürzeste Lösung der Länge L ist für jeden Buffer >= L
+    optimal (bei gleicher Länge gewinnt unabhängig vom Buffer der erste Pfad
+    in Suchreihenfolge), kleinere Buffer haben keine vollständige Lösung.
+
+    Liefert {'results': {Buffer: Ergebnis oder None}, 'min_buffer': L oder None,
+    'optimal': bool}. Ist das Zeitbudget abgelaufen ('optimal' False), ist
+    min_buffer nur eine obere Schranke.
+    """
+    buffer_sizes = sorted(buffer_sizes)
+    stats = {} if stats is None else stats
+    result = solve_breach_protocol(matrix, sequences, buffer_sizes[-1], engine, stats=stats,
+                                   time_budget_ms=time_budget_ms, cache=cache, trace=trace,
+                                   cancel=cancel, progress=progress)
+    min_buffer = len(result['sequence']) if result is not None else None
+    results = {size: result if min_buffer is not None and size >= min_buffer else None
+               for size in buffer_sizes}
+    return {'results': results, 'min_buffer': min_buffer, 'optimal': not stats.get('expired', False)}
+
 def format_solution(result: Dict, matrix: List[List[str]]) -> str:
     """Formatiert die Lösung mit der Matrix und Schrittnummern."""
     if not result:
@@ -114,6 +271,9 @@ def format_solution(result: Dict, matrix: List[List[str]]) -> str:
     )
 
 def main():
+    # Der Detector (OpenCV) wird nur hier gebraucht, nicht von den Solvern
+    from cv2_tmm import detect_breach_protocol_data
+
     print("=== Breach Protocol Detector ===")
     print("Lade Screenshot und erkenne Hex-Codes...")
     
@@ -134,7 +294,7 @@ def main():
             return
         
         print("\n=== Löse Breach Protocol ===")
-        result = solve_breach_protocol(matrix_grid, sequence_grid, BUFFER_SIZE)
+        result = solve_breach_protocol(matrix_grid, sequence_grid, BUFFER_SIZE, cache=SolutionCache())
         
         if result:
             print(format_solution(result, matrix_grid))
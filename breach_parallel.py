@@ -0,0 +1,262 @@
+"""Paralleles Lösen des Breach Protocol über einen Worker-Pool.
+
+Der Suchbaum wird bis zu einer festen Tiefe in Präfixe zerlegt (Startspalte
+und die ersten Züge), die als unabhängige Teilbäume an Prozesse oder Threads
+verteilt werden. Alle Worker lesen und aktualisieren eine gemeinsame Schranke
+für die beste bisher gefundene Länge und prunen dagegen.
+"""
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait
+from typing import List, Dict, Optional
+
+from breach_solver import (EncodedPuzzle, SequenceAutomaton, SearchBudget, BudgetExceeded,
+                           coverage_bounds, is_better_result, PROGRESS_INTERVAL)
+
+# Präfixtiefe für die Aufteilung: 2 ergibt bei 7x7 bis zu 42 Teilbäume
+SPLIT_DEPTH = 2
+
+
+class _SharedBound:
+    """
+    Gemeinsame Schranke für Threads mit der Schnittstelle von
+    multiprocessing.Value (für Prozesse): gelesen wird ohne Lock über
+    get_obj().value, gesenkt nur unter get_lock().
+    """
+
+    def __init__(self, value: int):
+        self.value = value
+        self._lock = threading.Lock()
+
+    def get_lock(self):
+        return self._lock
+
+    def get_obj(self):
+        return self
+
+
+class _SearchContext:
+    """Vorberechnete Suchstrukturen, einmal pro Worker aufgebaut."""
+
+    def __init__(self, matrix: List[List[str]], sequences: List[List[str]], buffer_size: int, shared):
+        self.puzzle = EncodedPuzzle(matrix, sequences)
+        self.automaton = SequenceAutomaton(self.puzzle.sequences, len(self.puzzle.symbols))
+        self.full = (1 << len(self.puzzle.sequences)) - 1
+        self.bounds = coverage_bounds(self.automaton, self.puzzle.matrix_symbols, self.full)
+        self.buffer_size = buffer_size
+        self.shared = shared
+
+    def walk(self, prefix: List[int]):
+        """Liefert (Zustand, Abdeckung, benutzte Zellen) nach dem Präfix."""
+        delta, covers, cells = self.automaton.delta, self.automaton.covers, self.puzzle.cells
+        state, covered, used = 0, covers[0], 0
+        for cell in prefix:
+            state = delta[state][cells[cell]]
+            covered |= covers[state]
+            used |= 1 << cell
+        return state, covered, used
+
+
+def split_prefixes(context: _SearchContext, depth: int) -> List[List[int]]:
+    """
+    Zerlegt den Suchbaum in Präfixe in Suchreihenfolge. Präfixe, die bereits
+    alle Sequenzen abdecken, werden nicht weiter verlängert.
+    """
+    puzzle, full = context.puzzle, context.full
+    rows, cols, width = puzzle.rows, puzzle.cols, puzzle.width
+    depth = min(depth, context.buffer_size)
+    prefixes = []
+
+    def expand(prefix: List[int]):
+        state, covered, used = context.walk(prefix)
+        if len(prefix) >= depth or covered == full:
+            prefixes.append(prefix)
+            return
+        cell = prefix[-1]
+        line = rows[cell // width] if len(prefix) % 2 == 0 else cols[cell % width]
+        for nxt in line:
+            if nxt != cell and not used >> nxt & 1:
+                expand(prefix + [nxt])
+
+    for start in rows[0]:
+        expand([start])
+    return prefixes
+
+
+def _search_subtree(context: _SearchContext, prefix: List[int], time_budget_ms: Optional[float],
+                    anytime: bool, cancel=None, progress=None):
+    """
+    Tiefensuche im Teilbaum unter prefix mit der gemeinsamen Schranke.
+    Gleich lange Lösungen werden nicht abgeschnitten, damit beim Zusammenführen
+    die Lösung des ersten Teilbaums in Suchreihenfolge gewinnt. cancel und
+    progress wirken wie bei SearchBudget, progress zählt nur diesen Teilbaum.
+    """
+    puzzle, automaton, bounds, full = context.puzzle, context.automaton, context.bounds, context.full
+    cells, rows, cols, width = puzzle.cells, puzzle.rows, puzzle.cols, puzzle.width
+    delta, covers = automaton.delta, automaton.covers
+    shared, buffer_size = context.shared, context.buffer_size
+    # Lesen ohne Lock: ein veralteter Wert schwächt höchstens das Pruning
+    bound = shared.get_obj()
+    budget = None
+    if time_budget_ms is not None or anytime or cancel is not None or progress is not None:
+        budget = SearchBudget(time_budget_ms, anytime, cancel=cancel, progress=progress)
+
+    path = list(prefix)
+    best: Optional[List[int]] = None
+    best_len = buffer_size + 1
+    expanded = 0
+
+    def backtrack(cell: int, move_horizontal: bool, used: int, state: int, covered: int):
+        nonlocal best, best_len, expanded
+
+        depth = len(path)
+        if covered == full:
+            if depth < best_len and depth <= bound.value:
+                best = path[:]
+                best_len = depth
+                if budget is not None:
+                    budget.improve(depth)
+                if depth < bound.value:
+                    with shared.get_lock():
+                        bound.value = min(bound.value, depth)
+            return
+
+        limit = min(buffer_size, bound.value, best_len - 1)
+        if depth + bounds[state][covered] > limit:
+            return
+
+        expanded += 1
+        if budget is not None:
+            budget.check()
+        line = rows[cell // width] if move_horizontal else cols[cell % width]
+        for nxt in line:
+            bit = 1 << nxt
+            if nxt == cell or used & bit:
+                continue
+            next_state = delta[state][cells[nxt]]
+            next_covered = covered | covers[next_state]
+            path.append(nxt)
+            if budget is not None and next_covered != covered:
+                budget.offer(path, next_covered)
+            backtrack(nxt, not move_horizontal, used | bit, next_state, next_covered)
+            path.pop()
+
+    state, covered, used = context.walk(prefix)
+    if budget is not None:
+        budget.offer(path, covered)
+    try:
+        backtrack(prefix[-1], len(prefix) % 2 == 0, used, state, covered)
+    except BudgetExceeded:
+        pass
+    partial = budget.partial if budget is not None else None
+    expired = budget is not None and budget.expired
+    return best, partial, expanded, expired
+
+
+# Kontext und Abbruch-Event des aktuellen Worker-Prozesses, gesetzt vom Pool-Initializer
+_WORKER_CONTEXT: Optional[_SearchContext] = None
+_WORKER_CANCEL = None
+
+
+def _init_worker(matrix, sequences, buffer_size, shared, cancel):
+    global _WORKER_CONTEXT, _WORKER_CANCEL
+    _WORKER_CONTEXT = _SearchContext(matrix, sequences, buffer_size, shared)
+    _WORKER_CANCEL = cancel
+
+
+def _process_task(prefix, wall_deadline, anytime):
+    time_budget_ms = None if wall_deadline is None else max(0.0, wall_deadline - time.time()) * 1000
+    return _search_subtree(_WORKER_CONTEXT, prefix, time_budget_ms, anytime, cancel=_WORKER_CANCEL)
+
+
+def solve_parallel(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                   stats: Optional[Dict] = None, budget: Optional[SearchBudget] = None,
+                   workers: Optional[int] = None, use_threads: bool = False,
+                   split_depth: int = SPLIT_DEPTH) -> Optional[Dict]:
+    """
+    Verteilt die Teilbäume unter den Präfixen aus split_prefixes auf einen
+    Prozess-Pool (bzw. Thread-Pool bei use_threads, sinnvoll auf einem
+    Python ohne GIL). Liefert dieselbe Lösung wie die sequentiellen Engines.
+    budget.cancel bricht auch laufende Teilbäume ab (Prozesse erhalten dafür
+    ein eigenes multiprocessing.Event). budget.progress erhalten bei Threads
+    die Teilbäume selbst, bei Prozessen meldet der Hauptprozess die Knoten
+    der fertigen Teilbäume und die gemeinsame Schranke.
+    """
+    workers = workers or os.cpu_count() or 1
+    # buffer_size + 1: noch keine Lösung gefunden
+    if use_threads:
+        shared = _SharedBound(buffer_size + 1)
+    else:
+        shared = multiprocessing.Value('i', buffer_size + 1, lock=True)
+    context = _SearchContext(matrix, sequences, buffer_size, shared)
+    prefixes = split_prefixes(context, split_depth)
+
+    anytime = budget is not None and budget.anytime
+    wall_deadline = None
+    if budget is not None and budget.deadline is not None:
+        wall_deadline = time.time() + (budget.deadline - time.perf_counter())
+
+    cancel = budget.cancel if budget is not None else None
+    progress = budget.progress if budget is not None else None
+    if use_threads:
+        def task(prefix):
+            time_budget_ms = None if wall_deadline is None else max(0.0, wall_deadline - time.time()) * 1000
+            return _search_subtree(context, prefix, time_budget_ms, anytime, cancel, progress)
+
+        executor = ThreadPoolExecutor(max_workers=workers)
+        futures = [executor.submit(task, prefix) for prefix in prefixes]
+        worker_cancel = None
+    else:
+        # Das Event des Aufrufers (meist threading.Event) erreicht andere Prozesse nicht
+        worker_cancel = multiprocessing.Event() if cancel is not None else None
+        executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                       initargs=(matrix, sequences, buffer_size, shared, worker_cancel))
+        futures = [executor.submit(_process_task, prefix, wall_deadline, anytime) for prefix in prefixes]
+
+    best = None
+    partial = None
+    expanded = 0
+    start = time.perf_counter()
+    with executor:
+        # Ergebnisse in Präfix-Reihenfolge zusammenführen: bei gleicher Länge gewinnt der frühere Teilbaum
+        for future in futures:
+            if not use_threads and (cancel is not None or progress is not None):
+                # Beim Warten auf Prozesse Abbruch weiterreichen und Fortschritt melden
+                while not wait([future], timeout=PROGRESS_INTERVAL).done:
+                    if cancel is not None and cancel.is_set():
+                        worker_cancel.set()
+                        break
+                    if progress is not None:
+                        elapsed = time.perf_counter() - start
+                        progress({'nodes': expanded, 'nodes_per_s': expanded / elapsed if elapsed else 0.0,
+                                  'best_len': shared.value if shared.value <= buffer_size else None})
+            if cancel is not None and cancel.is_set():
+                if worker_cancel is not None:
+                    worker_cancel.set()
+                for pending in futures:
+                    pending.cancel()
+                budget.expired = budget.cancelled = True
+                break
+            subtree_best, subtree_partial, subtree_expanded, expired = future.result()
+            expanded += subtree_expanded
+            if expired and budget is not None:
+                budget.expired = True
+            if subtree_best is not None and (best is None or len(subtree_best) < len(best)):
+                best = subtree_best
+            if subtree_partial is not None:
+                candidate = context.puzzle.build_result(subtree_partial[1], sequences)
+                if is_better_result(candidate, partial):
+                    partial = candidate
+
+    if cancel is not None and cancel.is_set():
+        # Auch ein Abbruch während des letzten Teilbaums zählt
+        budget.expired = budget.cancelled = True
+
+    if stats is not None:
+        stats['expanded'] = expanded
+        stats['subtrees'] = len(prefixes)
+    if best is not None:
+        return context.puzzle.build_result(best, sequences)
+    return partial if anytime else None
@@ -0,0 +1,872 @@
+"""Schnelle Such-Engines für das Breach Protocol.
+
+Die Matrix wird einmal in ganzzahlige Symbol-Codes übersetzt, Zellen werden
+über einen flachen Index (y * Breite + x) angesprochen und die bereits
+benutzten Zellen als einzelne int-Bitmaske geführt. Alle Engines liefern
+dasselbe Ergebnis-Dict wie ``breach_hack.solve_breach_protocol``.
+"""
+import heapq
+import time
+from functools import lru_cache
+from itertools import combinations
+from typing import Callable, List, Dict, Optional
+
+import numpy as np
+
+# Obergrenze für die Memo-Tabelle des DP-Solvers (Einträge)
+DP_CACHE_SIZE = 1 << 20
+# Mindestabstand zweier Fortschrittsmeldungen einer Suche (s)
+PROGRESS_INTERVAL = 0.1
+# solve_frontier führt die benutzten Zellen als uint64-Bitmaske
+FRONTIER_MAX_CELLS = 64
+INFINITY = float("inf")
+
+
+class BudgetExceeded(Exception):
+    """Wird ausgelöst, wenn das Zeitbudget einer Suche abgelaufen ist oder sie abgebrochen wurde."""
+
+
+class SearchBudget:
+    """
+    Zeitbudget einer Suche. Die Engines rufen check() pro expandiertem Knoten
+    auf und melden neu abgedeckte Sequenzen über offer(), damit im
+    Anytime-Modus die beste Teil-Lösung zurückgegeben werden kann.
+
+    Ein gesetztes cancel-Event bricht die Suche wie ein abgelaufenes Budget
+    ab (zusätzlich cancelled=True). progress wird höchstens alle
+    PROGRESS_INTERVAL Sekunden mit einem Dict aufgerufen: expandierte Knoten
+    ('nodes'), Knoten pro Sekunde ('nodes_per_s') und Länge der besten
+    bisher gefundenen Lösung ('best_len', None solange keine), die die
+    Engines über improve() melden.
+    """
+    CHECK_INTERVAL = 256
+
+    def __init__(self, time_budget_ms: Optional[float] = None, anytime: bool = False,
+                 deadline: Optional[float] = None, cancel=None,
+                 progress: Optional[Callable[[Dict], None]] = None):
+        if deadline is None and time_budget_ms is not None:
+            deadline = time.perf_counter() + time_budget_ms / 1000
+        self.deadline = deadline
+        self.anytime = anytime
+        self.cancel = cancel
+        self.progress = progress
+        self.expired = False
+        self.cancelled = False
+        # Beste Teil-Lösung: (Anzahl abgedeckter Sequenzen, Pfad als Zellindizes)
+        self.partial = None
+        self.best_len: Optional[int] = None
+        self._ticks = 0
+        self._start = self._last_report = time.perf_counter()
+
+    def child(self) -> "SearchBudget":
+        """Neues Budget mit derselben Deadline und demselben Abbruch, ohne Anytime-Buchführung."""
+        return SearchBudget(deadline=self.deadline, cancel=self.cancel, progress=self.progress)
+
+    def check(self):
+        self._ticks += 1
+        if self._ticks % self.CHECK_INTERVAL:
+            return
+        self._poll()
+
+    def check_batch(self, nodes: int):
+        """Wie check(), aber für nodes auf einmal expandierte Knoten (prüft immer)."""
+        self._ticks += nodes
+        self._poll()
+
+    def _poll(self):
+        if self.cancel is not None and self.cancel.is_set():
+            self.expired = self.cancelled = True
+            raise BudgetExceeded()
+        if self.deadline is None and self.progress is None:
+            return
+        now = time.perf_counter()
+        if self.deadline is not None and now >= self.deadline:
+            self.expired = True
+            raise BudgetExceeded()
+        if self.progress is not None and now - self._last_report >= PROGRESS_INTERVAL:
+            self._last_report = now
+            self.progress({'nodes': self._ticks, 'nodes_per_s': self._ticks / (now - self._start),
+                           'best_len': self.best_len})
+
+    def improve(self, length: int):
+        """Meldet eine vollständige Lösung der Länge length."""
+        if self.best_len is None or length < self.best_len:
+            self.best_len = length
+
+    def offer(self, path, covered: int):
+        if not self.anytime:
+            return
+        count = covered.bit_count()
+        if count and (self.partial is None or count > self.partial[0]
+                      or (count == self.partial[0] and len(path) < len(self.partial[1]))):
+            self.partial = (count, list(path))
+
+
+class EncodedPuzzle:
+    """Ganzzahlige Darstellung von Matrix und Sequenzen."""
+
+    def __init__(self, matrix: List[List[str]], sequences: List[List[str]]):
+        self.height, self.width = len(matrix), len(matrix[0])
+        self.symbols: List[str] = []
+        codes: Dict[str, int] = {}
+
+        def encode(value: str) -> int:
+            if value not in codes:
+                codes[value] = len(self.symbols)
+                self.symbols.append(value)
+            return codes[value]
+
+        # Flache Zellenliste: Index y * width + x -> Symbol-Code
+        self.cells = [encode(matrix[y][x]) for y in range(self.height) for x in range(self.width)]
+        self.matrix_symbols = len(self.symbols)
+        # Symbole, die nur in Sequenzen vorkommen, bekommen eigene Codes und matchen nie
+        self.sequences = [[encode(value) for value in seq] for seq in sequences]
+        self.rows = [[y * self.width + x for x in range(self.width)] for y in range(self.height)]
+        self.cols = [[y * self.width + x for y in range(self.height)] for x in range(self.width)]
+
+    def position(self, cell: int):
+        """Wandelt einen flachen Zellindex in (x, y) um."""
+        return cell % self.width, cell // self.width
+
+    def build_result(self, cells: List[int], sequences: List[List[str]]) -> Dict:
+        """Baut das Ergebnis-Dict im Format von solve_breach_protocol."""
+        symbols = [self.symbols[self.cells[cell]] for cell in cells]
+        covered = [seq for seq in sequences if contains_sequence(symbols, seq)]
+        return {
+            'path': [self.position(cell) for cell in cells],
+            'sequence': symbols,
+            'covered_sequences': covered
+        }
+
+
+def contains_sequence(main: List, sub: List) -> bool:
+    """Prüft, ob eine Teilsequenz in der Hauptsequenz enthalten ist."""
+    for i in range(len(main) - len(sub) + 1):
+        if main[i:i + len(sub)] == sub:
+            return True
+    return False
+
+
+class SequenceAutomaton:
+    """
+    Aho-Corasick-Automat über alle Daemon-Sequenzen.
+    delta[state][symbol] liefert den Folgezustand, covers[state] die Bitmaske
+    aller Sequenzen, die mit dem zuletzt gelesenen Symbol enden.
+    """
+
+    def __init__(self, sequences: List[List[int]], alphabet_size: int):
+        goto: List[Dict[int, int]] = [{}]
+        covers = [0]
+        for i, seq in enumerate(sequences):
+            state = 0
+            for symbol in seq:
+                if symbol not in goto[state]:
+                    goto.append({})
+                    covers.append(0)
+                    goto[state][symbol] = len(goto) - 1
+                state = goto[state][symbol]
+            covers[state] |= 1 << i
+
+        # Breitensuche über den Trie: Fehlerlinks auflösen und vollständige Übergangstabelle bauen
+        self.delta = [[0] * alphabet_size for _ in goto]
+        fail = [0] * len(goto)
+        queue = []
+        for symbol, child in goto[0].items():
+            self.delta[0][symbol] = child
+            queue.append(child)
+        for state in queue:
+            covers[state] |= covers[fail[state]]
+            for symbol in range(alphabet_size):
+                child = goto[state].get(symbol)
+                if child is None:
+                    self.delta[state][symbol] = self.delta[fail[state]][symbol]
+                else:
+                    fail[child] = self.delta[fail[state]][symbol]
+                    self.delta[state][symbol] = child
+                    queue.append(child)
+        self.covers = covers
+        self.size = len(goto)
+
+
+def coverage_bounds(automaton: SequenceAutomaton, alphabet_size: int, full: int) -> List[List[float]]:
+    """
+    Untere Schranke bounds[state][covered] für die Anzahl noch nötiger Symbole.
+    Entspricht der Länge der kürzesten überlappenden Verkettung der noch nicht
+    abgedeckten Sequenzen, ausgehend vom aktuellen Teiltreffer, und ignoriert
+    die Zugregeln der Matrix (daher zulässig und konsistent).
+    """
+    bounds = [[INFINITY] * (full + 1) for _ in range(automaton.size)]
+    for state in range(automaton.size):
+        bounds[state][full] = 0
+    changed = True
+    while changed:
+        changed = False
+        for state in range(automaton.size):
+            row = automaton.delta[state]
+            for covered in range(full):
+                best = bounds[state][covered]
+                for symbol in range(alphabet_size):
+                    nxt = row[symbol]
+                    steps = bounds[nxt][covered | automaton.covers[nxt]] + 1
+                    if steps < best:
+                        best = steps
+                if best < bounds[state][covered]:
+                    bounds[state][covered] = best
+                    changed = True
+    return bounds
+
+
+def preprocess_puzzle(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int) -> Dict:
+    """
+    Vorverarbeitung vor der Suche. Unerreichbar sind Daemons mit einem Symbol,
+    das nicht in der Matrix vorkommt, oder die länger als der Buffer sind.
+    Von den übrigen entfallen Duplikate und Daemons, die in einem anderen
+    enthalten sind, da sie mit diesem automatisch abgedeckt werden.
+
+    Liefert {'sequences': verbleibende Daemons, 'reachable': alle erreichbaren
+    Daemons, 'redundant': entfallene, 'unreachable': unerreichbare,
+    'min_length': Länge der kürzesten überlappenden Verkettung der
+    verbleibenden Daemons (untere Schranke, ohne Zugregeln), 'feasible':
+    False, wenn eine vollständige Lösung sicher ausgeschlossen ist}.
+    """
+    symbols = {value for row in matrix for value in row}
+    reachable, unreachable = [], []
+    for seq in sequences:
+        if len(seq) > buffer_size or any(value not in symbols for value in seq):
+            unreachable.append(seq)
+        else:
+            reachable.append(seq)
+
+    kept, redundant = [], []
+    for i, seq in enumerate(reachable):
+        # Bei Duplikaten bleibt das erste erhalten
+        covered_by_other = any(
+            contains_sequence(other, seq) and (len(other) > len(seq) or (other == seq and j < i))
+            for j, other in enumerate(reachable) if j != i
+        )
+        (redundant if covered_by_other else kept).append(seq)
+
+    min_length = 0
+    if kept:
+        puzzle = EncodedPuzzle(matrix, kept)
+        automaton = SequenceAutomaton(puzzle.sequences, len(puzzle.symbols))
+        full = (1 << len(kept)) - 1
+        min_length = coverage_bounds(automaton, puzzle.matrix_symbols, full)[0][0]
+    return {
+        'sequences': kept,
+        'reachable': reachable,
+        'redundant': redundant,
+        'unreachable': unreachable,
+        'min_length': min_length,
+        'feasible': not unreachable and min_length <= buffer_size,
+    }
+
+
+def _finish(puzzle: EncodedPuzzle, best, sequences: List[List[str]],
+            budget: Optional[SearchBudget]) -> Optional[Dict]:
+    """Ergebnis aus der besten vollständigen oder (Anytime) der besten Teil-Lösung."""
+    if best is not None:
+        return puzzle.build_result(list(best), sequences)
+    if budget is not None and budget.partial is not None:
+        return puzzle.build_result(budget.partial[1], sequences)
+    return None
+
+
+def solve_bitmask(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                  stats: Optional[Dict] = None, budget: Optional[SearchBudget] = None) -> Optional[Dict]:
+    """
+    Tiefensuche mit Bitmaske für benutzte Zellen und In-place-Pfad.
+    Durchsucht den Baum in derselben Reihenfolge wie der ursprüngliche
+    Backtracker und liefert daher exakt dieselbe Lösung.
+    """
+    puzzle = EncodedPuzzle(matrix, sequences)
+    cells, rows, cols, width = puzzle.cells, puzzle.rows, puzzle.cols, puzzle.width
+    targets = [(1 << i, seq, len(seq)) for i, seq in enumerate(puzzle.sequences)]
+    full = (1 << len(targets)) - 1
+
+    path: List[int] = []
+    symbols: List[int] = []
+    best: Optional[List[int]] = None
+    best_len = buffer_size + 1
+    expanded = prunes = max_depth = coverage_checks = 0
+
+    def update_covered(covered: int) -> int:
+        nonlocal coverage_checks
+        coverage_checks += 1
+        # Eine neu abgedeckte Sequenz muss mit dem zuletzt gewählten Symbol enden
+        length = len(symbols)
+        for bit, seq, seq_len in targets:
+            if not covered & bit and seq_len <= length and symbols[length - seq_len:] == seq:
+                covered |= bit
+        return covered
+
+    def backtrack(cell: int, move_horizontal: bool, used: int, covered: int):
+        nonlocal best, best_len, expanded, prunes, max_depth
+
+        depth = len(path)
+        if depth > max_depth:
+            max_depth = depth
+        if covered == full and depth < best_len:
+            best = path[:]
+            best_len = depth
+            if budget is not None:
+                budget.improve(depth)
+            return
+
+        # Puffer voll oder bereits länger als die beste Lösung
+        if depth >= buffer_size or depth >= best_len:
+            prunes += 1
+            return
+
+        expanded += 1
+        if budget is not None:
+            budget.check()
+        line = rows[cell // width] if move_horizontal else cols[cell % width]
+        for nxt in line:
+            bit = 1 << nxt
+            if nxt == cell or used & bit:
+                continue
+            path.append(nxt)
+            symbols.append(cells[nxt])
+            next_covered = update_covered(covered)
+            if budget is not None and next_covered != covered:
+                budget.offer(path, next_covered)
+            backtrack(nxt, not move_horizontal, used | bit, next_covered)
+            path.pop()
+            symbols.pop()
+
+    # Leere Sequenzen sind immer abgedeckt
+    initial = sum(bit for bit, _, seq_len in targets if seq_len == 0)
+    try:
+        for start in rows[0]:
+            path.append(start)
+            symbols.append(cells[start])
+            covered = update_covered(initial)
+            if budget is not None:
+                budget.offer(path, covered)
+            backtrack(start, False, 1 << start, covered)
+            path.pop()
+            symbols.pop()
+    except BudgetExceeded:
+        pass
+
+    if stats is not None:
+        stats.update(expanded=expanded, prunes=prunes, max_depth=max_depth, coverage_checks=coverage_checks)
+    return _finish(puzzle, best, sequences, budget)
+
+
+def solve_automaton(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                    stats: Optional[Dict] = None, budget: Optional[SearchBudget] = None) -> Optional[Dict]:
+    """
+    Tiefensuche wie solve_bitmask, die Abdeckung wird aber über einen
+    Aho-Corasick-Automaten in O(1) pro angehängtem Symbol fortgeschrieben.
+    """
+    puzzle = EncodedPuzzle(matrix, sequences)
+    cells, rows, cols, width = puzzle.cells, puzzle.rows, puzzle.cols, puzzle.width
+    automaton = SequenceAutomaton(puzzle.sequences, len(puzzle.symbols))
+    delta, covers = automaton.delta, automaton.covers
+    full = (1 << len(puzzle.sequences)) - 1
+
+    path: List[int] = []
+    best: Optional[List[int]] = None
+    best_len = buffer_size + 1
+    expanded = prunes = max_depth = coverage_checks = 0
+
+    def backtrack(cell: int, move_horizontal: bool, used: int, state: int, covered: int):
+        nonlocal best, best_len, expanded, prunes, max_depth, coverage_checks
+
+        depth = len(path)
+        if depth > max_depth:
+            max_depth = depth
+        if covered == full and depth < best_len:
+            best = path[:]
+            best_len = depth
+            if budget is not None:
+                budget.improve(depth)
+            return
+
+        if depth >= buffer_size or depth >= best_len:
+            prunes += 1
+            return
+
+        expanded += 1
+        if budget is not None:
+            budget.check()
+        line = rows[cell // width] if move_horizontal else cols[cell % width]
+        for nxt in line:
+            bit = 1 << nxt
+            if nxt == cell or used & bit:
+                continue
+            coverage_checks += 1
+            next_state = delta[state][cells[nxt]]
+            next_covered = covered | covers[next_state]
+            path.append(nxt)
+            if budget is not None and next_covered != covered:
+                budget.offer(path, next_covered)
+            backtrack(nxt, not move_horizontal, used | bit, next_state, next_covered)
+            path.pop()
+
+    try:
+        for start in rows[0]:
+            state = delta[0][cells[start]]
+            covered = covers[0] | covers[state]
+            path.append(start)
+            if budget is not None:
+                budget.offer(path, covered)
+            backtrack(start, False, 1 << start, state, covered)
+            path.pop()
+    except BudgetExceeded:
+        pass
+
+    if stats is not None:
+        stats.update(expanded=expanded, prunes=prunes, max_depth=max_depth, coverage_checks=coverage_checks)
+    return _finish(puzzle, best, sequences, budget)
+
+
+def solve_dp(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+             stats: Optional[Dict] = None, budget: Optional[SearchBudget] = None,
+             cache_size: int = DP_CACHE_SIZE) -> Optional[Dict]:
+    """
+    Exakter DP-Solver mit Transpositionstabelle.
+
+    memo(cell, horizontal, state, covered, remaining) liefert die minimale Anzahl
+    weiterer Schritte, ohne die Sperrung bereits benutzter Zellen zu beachten.
+    Das ist eine zulässige untere Schranke; ist der daraus rekonstruierte Pfad
+    frei von Wiederholungen, ist er optimal. Sonst wird mit der Schranke als
+    Pruning exakt nachgesucht.
+    """
+    puzzle = EncodedPuzzle(matrix, sequences)
+    cells, rows, cols, width = puzzle.cells, puzzle.rows, puzzle.cols, puzzle.width
+    automaton = SequenceAutomaton(puzzle.sequences, len(puzzle.symbols))
+    delta, covers = automaton.delta, automaton.covers
+    full = (1 << len(puzzle.sequences)) - 1
+    # Automaten-Übergänge in der Relaxierung und der exakten Suche
+    coverage_checks = 0
+
+    @lru_cache(maxsize=cache_size)
+    def memo(cell: int, move_horizontal: bool, state: int, covered: int, remaining: int):
+        nonlocal coverage_checks
+        if covered == full:
+            return 0
+        if remaining == 0:
+            return INFINITY
+        if budget is not None:
+            budget.check()
+        best = INFINITY
+        line = rows[cell // width] if move_horizontal else cols[cell % width]
+        for nxt in line:
+            if nxt == cell:
+                continue
+            coverage_checks += 1
+            next_state = delta[state][cells[nxt]]
+            steps = memo(nxt, not move_horizontal, next_state, covered | covers[next_state], remaining - 1)
+            if steps < best:
+                best = steps
+                if best == 0:
+                    break
+        return best + 1
+
+    def start_node(start: int):
+        state = delta[0][cells[start]]
+        return start, False, state, covers[0] | covers[state], buffer_size - 1
+
+    def relaxed_path(relaxed_len: int) -> List[int]:
+        # Erster optimaler Pfad der Relaxierung in Suchreihenfolge
+        path = []
+        for start in rows[0]:
+            node = start_node(start)
+            if 1 + memo(*node) == relaxed_len:
+                path.append(start)
+                break
+        while node[3] != full:
+            cell, move_horizontal, state, covered, remaining = node
+            target = memo(*node) - 1
+            line = rows[cell // width] if move_horizontal else cols[cell % width]
+            for nxt in line:
+                if nxt == cell:
+                    continue
+                next_state = delta[state][cells[nxt]]
+                candidate = (nxt, not move_horizontal, next_state, covered | covers[next_state], remaining - 1)
+                if memo(*candidate) == target:
+                    node = candidate
+                    path.append(nxt)
+                    break
+        return path
+
+    try:
+        relaxed_len = min((1 + memo(*start_node(start)) for start in rows[0]), default=INFINITY)
+        if relaxed_len != INFINITY:
+            path = relaxed_path(relaxed_len)
+    except BudgetExceeded:
+        relaxed_len = None
+    if relaxed_len is None or relaxed_len == INFINITY:
+        if stats is not None:
+            stats.update(expanded=0, prunes=0, max_depth=0, coverage_checks=coverage_checks,
+                         memo_entries=memo.cache_info().currsize)
+        if budget is not None:
+            # Keine vollständige Abdeckung gefunden: Startzellen als Teil-Lösungen melden
+            for start in rows[0]:
+                budget.offer([start], start_node(start)[3])
+        return _finish(puzzle, None, sequences, budget)
+
+    if len(set(path)) == len(path):
+        if stats is not None:
+            stats.update(expanded=len(path), prunes=0, max_depth=len(path), coverage_checks=coverage_checks,
+                         memo_entries=memo.cache_info().currsize)
+        return puzzle.build_result(path, sequences)
+
+    # Relaxierte Lösung benutzt eine Zelle doppelt: exakte Suche mit der Schranke
+    path = []
+    best: Optional[List[int]] = None
+    best_len = buffer_size + 1
+    expanded = prunes = max_depth = 0
+
+    def backtrack(cell: int, move_horizontal: bool, used: int, state: int, covered: int):
+        nonlocal best, best_len, expanded, prunes, max_depth, coverage_checks
+
+        depth = len(path)
+        if depth > max_depth:
+            max_depth = depth
+        if covered == full and depth < best_len:
+            best = path[:]
+            best_len = depth
+            if budget is not None:
+                budget.improve(depth)
+            return
+
+        if depth + memo(cell, move_horizontal, state, covered, buffer_size - depth) >= best_len:
+            prunes += 1
+            return
+
+        expanded += 1
+        if budget is not None:
+            budget.check()
+        line = rows[cell // width] if move_horizontal else cols[cell % width]
+        for nxt in line:
+            bit = 1 << nxt
+            if nxt == cell or used & bit:
+                continue
+            coverage_checks += 1
+            next_state = delta[state][cells[nxt]]
+            next_covered = covered | covers[next_state]
+            path.append(nxt)
+            if budget is not None and next_covered != covered:
+                budget.offer(path, next_covered)
+            backtrack(nxt, not move_horizontal, used | bit, next_state, next_covered)
+            path.pop()
+
+    try:
+        for start in rows[0]:
+            state = delta[0][cells[start]]
+            covered = covers[0] | covers[state]
+            path.append(start)
+            if budget is not None:
+                budget.offer(path, covered)
+            backtrack(start, False, 1 << start, state, covered)
+            path.pop()
+    except BudgetExceeded:
+        pass
+
+    if stats is not None:
+        stats.update(expanded=expanded, prunes=prunes, max_depth=max_depth, coverage_checks=coverage_checks,
+                     memo_entries=memo.cache_info().currsize)
+    return _finish(puzzle, best, sequences, budget)
+
+
+def solve_astar(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                stats: Optional[Dict] = None, budget: Optional[SearchBudget] = None) -> Optional[Dict]:
+    """
+    Best-First-Suche (A*) mit coverage_bounds als Heuristik.
+    Da die Heuristik konsistent ist, ist die erste vollständige Lösung, die
+    vom Heap genommen wird, optimal. Gleich lange Knoten werden nach ihrem
+    Pfad sortiert, dadurch entspricht die Lösung der der Tiefensuche.
+    """
+    puzzle = EncodedPuzzle(matrix, sequences)
+    cells, rows, cols, width = puzzle.cells, puzzle.rows, puzzle.cols, puzzle.width
+    automaton = SequenceAutomaton(puzzle.sequences, len(puzzle.symbols))
+    delta, covers = automaton.delta, automaton.covers
+    full = (1 << len(puzzle.sequences)) - 1
+    bounds = coverage_bounds(automaton, puzzle.matrix_symbols, full)
+
+    # Heap-Einträge: (f, Pfad, Zustand, Abdeckung, benutzte Zellen)
+    heap = []
+    for start in rows[0]:
+        state = delta[0][cells[start]]
+        covered = covers[0] | covers[state]
+        estimate = 1 + bounds[state][covered]
+        if budget is not None:
+            budget.offer((start,), covered)
+        if estimate <= buffer_size:
+            heap.append((estimate, (start,), state, covered, 1 << start))
+    heapq.heapify(heap)
+
+    seen = set()
+    expanded = generated = prunes = max_depth = coverage_checks = 0
+    best: Optional[tuple] = None
+    try:
+        while heap:
+            _, path, state, covered, used = heapq.heappop(heap)
+            if covered == full:
+                best = path
+                break
+
+            # Gleiche Zelle, gleiche benutzte Zellen und gleicher Automatenzustand: Teilbaum identisch
+            cell = path[-1]
+            key = (cell, used, state, covered)
+            if key in seen:
+                prunes += 1
+                continue
+            seen.add(key)
+            expanded += 1
+            if budget is not None:
+                budget.check()
+
+            depth = len(path)
+            if depth > max_depth:
+                max_depth = depth
+            line = rows[cell // width] if depth % 2 == 0 else cols[cell % width]
+            for nxt in line:
+                bit = 1 << nxt
+                if nxt == cell or used & bit:
+                    continue
+                coverage_checks += 1
+                next_state = delta[state][cells[nxt]]
+                next_covered = covered | covers[next_state]
+                if budget is not None and next_covered != covered:
+                    budget.offer(path + (nxt,), next_covered)
+                estimate = depth + 1 + bounds[next_state][next_covered]
+                if estimate <= buffer_size:
+                    generated += 1
+                    heapq.heappush(heap, (estimate, path + (nxt,), next_state, next_covered, used | bit))
+                else:
+                    prunes += 1
+    except BudgetExceeded:
+        pass
+
+    if stats is not None:
+        stats.update(expanded=expanded, generated=generated, prunes=prunes, max_depth=max_depth,
+                     coverage_checks=coverage_checks)
+    return _finish(puzzle, best, sequences, budget)
+
+
+def solve_frontier(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                   stats: Optional[Dict] = None, budget: Optional[SearchBudget] = None) -> Optional[Dict]:
+    """
+    Breitensuche nach Pfadlänge mit NumPy: Die ganze Front einer Ebene liegt
+    als Arrays (Zelle, benutzte Zellen, Automatenzustand, Abdeckung) vor, alle
+    Nachfolger in der aktuellen Zeile bzw. Spalte werden auf einmal erzeugt.
+    Gleiche Zustände werden zusammengefasst, Zustände, die den Buffer laut
+    coverage_bounds nicht mehr einhalten können, verworfen. Die erste Ebene
+    mit vollständiger Abdeckung hat die optimale Länge.
+
+    Die Front ist nach Pfaden sortiert und beim Zusammenfassen bleibt der
+    erste Pfad erhalten, daher entspricht die Lösung der der Tiefensuche.
+    Matrizen mit mehr als FRONTIER_MAX_CELLS Zellen löst solve_dp.
+    """
+    puzzle = EncodedPuzzle(matrix, sequences)
+    width, height = puzzle.width, puzzle.height
+    if width * height > FRONTIER_MAX_CELLS:
+        return solve_dp(matrix, sequences, buffer_size, stats=stats, budget=budget)
+    automaton = SequenceAutomaton(puzzle.sequences, len(puzzle.symbols))
+    full = (1 << len(puzzle.sequences)) - 1
+
+    cells = np.array(puzzle.cells, dtype=np.int64)
+    delta = np.array(automaton.delta, dtype=np.int64)
+    covers = np.array(automaton.covers, dtype=np.int64)
+    bounds = np.array(coverage_bounds(automaton, puzzle.matrix_symbols, full))
+    bits = np.left_shift(np.uint64(1), np.arange(width * height, dtype=np.uint64))
+    popcount = np.array([covered.bit_count() for covered in range(full + 1)])
+    # Kandidaten je Zelle: gerade Pfadlänge -> eigene Zeile, ungerade -> eigene Spalte
+    lines = (np.array([puzzle.rows[cell // width] for cell in range(width * height)], dtype=np.int64),
+             np.array([puzzle.cols[cell % width] for cell in range(width * height)], dtype=np.int64))
+
+    # Ebene 1: Startzellen der ersten Zeile
+    cell = np.array(puzzle.rows[0], dtype=np.int64)
+    state = delta[0, cells[cell]]
+    covered = covers[state]
+    used = bits[cell]
+    # Pro Ebene: Index des Vorgängers in der vorigen Ebene und gewählte Zelle
+    levels = [(np.full(len(cell), -1), cell)]
+    expanded = generated = prunes = coverage_checks = frontier_max = 0
+
+    def path_to(level: int, index: int) -> List[int]:
+        path = []
+        while index >= 0:
+            parents, chosen = levels[level]
+            path.append(int(chosen[index]))
+            index = int(parents[index])
+            level -= 1
+        return path[::-1]
+
+    def offer(covered):
+        if budget is not None and budget.anytime and len(covered):
+            best = int(np.argmax(popcount[covered]))
+            budget.offer(path_to(len(levels) - 1, best), int(covered[best]))
+
+    best = None
+    offer(covered)
+    keep = 1 + bounds[state, covered] <= buffer_size
+    prunes += int(len(keep) - keep.sum())
+    levels[0] = (levels[0][0][keep], cell[keep])
+    cell, used, state, covered = cell[keep], used[keep], state[keep], covered[keep]
+    try:
+        while len(cell):
+            depth = len(levels)
+            done = np.flatnonzero(covered == full)
+            if len(done):
+                best = path_to(depth - 1, int(done[0]))
+                if budget is not None:
+                    budget.improve(depth)
+                break
+            if depth >= buffer_size:
+                break
+
+            expanded += len(cell)
+            frontier_max = max(frontier_max, len(cell))
+            if budget is not None:
+                budget.check_batch(len(cell))
+
+            # Alle Nachfolger, zeilenweise in Pfad-Reihenfolge
+            candidates = lines[depth % 2][cell]
+            parent, column = np.nonzero((used[:, None] & bits[candidates]) == 0)
+            nxt = candidates[parent, column]
+            next_state = delta[state[parent], cells[nxt]]
+            next_covered = covered[parent] | covers[next_state]
+            coverage_checks += len(nxt)
+            levels.append((parent, nxt))
+            offer(next_covered)
+
+            keep = np.flatnonzero(depth + 1 + bounds[next_state, next_covered] <= buffer_size)
+            # Gleiche Zustände haben gleiche Teilbäume: jeweils den ersten Pfad behalten
+            next_used = used[parent[keep]] | bits[nxt[keep]]
+            node = ((nxt[keep] * automaton.size + next_state[keep]) << len(puzzle.sequences)) | next_covered[keep]
+            # lexsort ist stabil: der erste Eintrag jeder Gruppe ist der erste Pfad
+            order = np.lexsort((node, next_used))
+            next_used, node = next_used[order], node[order]
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = (next_used[1:] != next_used[:-1]) | (node[1:] != node[:-1])
+            keep = keep[np.sort(order[first])]
+            prunes += len(nxt) - len(keep)
+            generated += len(keep)
+
+            levels[-1] = (parent[keep], nxt[keep])
+            cell, state, covered = nxt[keep], next_state[keep], next_covered[keep]
+            used = used[parent[keep]] | bits[cell]
+    except BudgetExceeded:
+        pass
+
+    if stats is not None:
+        stats.update(expanded=expanded, generated=generated, prunes=prunes, max_depth=len(levels),
+                     coverage_checks=coverage_checks, frontier_max=frontier_max)
+    return _finish(puzzle, best, sequences, budget)
+
+
+def iter_solutions(matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                   stats: Optional[Dict] = None, budget: Optional[SearchBudget] = None):
+    """
+    Generator über alle Lösungen (Pfade, die alle Sequenzen abdecken und dort
+    enden) in nichtfallender Länge, bei gleicher Länge in Suchreihenfolge.
+    Die erste Lösung ist daher die von solve_astar. Wie solve_astar, aber
+    ohne Zusammenfassen gleicher Suchzustände, da verschiedene Pfade
+    verschiedene Lösungen sind; gesucht wird nur so weit, wie der Aufrufer
+    iteriert. Bei abgelaufenem Budget endet der Generator.
+    """
+    puzzle = EncodedPuzzle(matrix, sequences)
+    cells, rows, cols, width = puzzle.cells, puzzle.rows, puzzle.cols, puzzle.width
+    automaton = SequenceAutomaton(puzzle.sequences, len(puzzle.symbols))
+    delta, covers = automaton.delta, automaton.covers
+    full = (1 << len(puzzle.sequences)) - 1
+    bounds = coverage_bounds(automaton, puzzle.matrix_symbols, full)
+
+    # Heap-Einträge: (f, Pfad, Zustand, Abdeckung, benutzte Zellen)
+    heap = []
+    for start in rows[0]:
+        state = delta[0][cells[start]]
+        covered = covers[0] | covers[state]
+        estimate = 1 + bounds[state][covered]
+        if estimate <= buffer_size:
+            heap.append((estimate, (start,), state, covered, 1 << start))
+    heapq.heapify(heap)
+
+    expanded = generated = 0
+    try:
+        while heap:
+            _, path, state, covered, used = heapq.heappop(heap)
+            if covered == full:
+                if stats is not None:
+                    stats['expanded'] = expanded
+                    stats['generated'] = generated
+                yield puzzle.build_result(list(path), sequences)
+                continue
+
+            expanded += 1
+            if budget is not None:
+                budget.check()
+
+            cell = path[-1]
+            depth = len(path)
+            line = rows[cell // width] if depth % 2 == 0 else cols[cell % width]
+            for nxt in line:
+                bit = 1 << nxt
+                if nxt == cell or used & bit:
+                    continue
+                next_state = delta[state][cells[nxt]]
+                next_covered = covered | covers[next_state]
+                estimate = depth + 1 + bounds[next_state][next_covered]
+                if estimate <= buffer_size:
+                    generated += 1
+                    heapq.heappush(heap, (estimate, path + (nxt,), next_state, next_covered, used | bit))
+    except BudgetExceeded:
+        pass
+    if stats is not None:
+        stats['expanded'] = expanded
+        stats['generated'] = generated
+
+
+def is_better_result(candidate: Optional[Dict], current: Optional[Dict]) -> bool:
+    """Mehr abgedeckte Sequenzen gewinnen, bei Gleichstand der kürzere Pfad."""
+    if candidate is None:
+        return False
+    if current is None:
+        return True
+    return (len(candidate['covered_sequences']), -len(candidate['sequence'])) > \
+        (len(current['covered_sequences']), -len(current['sequence']))
+
+
+def solve_within_budget(solver, matrix: List[List[str]], sequences: List[List[str]], buffer_size: int,
+                        budget: SearchBudget, stats: Optional[Dict] = None) -> Optional[Dict]:
+    """
+    Führt eine Engine mit Zeitbudget aus. Das Ergebnis erhält das Feld
+    'optimal', das angibt, ob die Suche vor Ablauf des Budgets abgeschlossen
+    wurde. Im Anytime-Modus wird bei unmöglicher vollständiger Abdeckung die
+    größte abdeckbare Teilmenge der Sequenzen (dann die kürzeste) gesucht.
+    """
+    result = solver(matrix, sequences, buffer_size, stats=stats, budget=budget)
+    complete = result is not None and len(result['covered_sequences']) == len(sequences)
+
+    if budget.anytime and not budget.expired and not complete:
+        # Teilmengen absteigender Größe, bis eine davon vollständig lösbar ist
+        for size in range(len(sequences) - 1, 0, -1):
+            level_best = None
+            for subset in combinations(range(len(sequences)), size):
+                child = budget.child()
+                candidate = solver(matrix, [sequences[i] for i in subset], buffer_size, budget=child)
+                if child.expired:
+                    budget.expired = True
+                    budget.cancelled = child.cancelled
+                if candidate is not None:
+                    candidate['covered_sequences'] = [
+                        seq for seq in sequences if contains_sequence(candidate['sequence'], seq)
+                    ]
+                    if is_better_result(candidate, level_best):
+                        level_best = candidate
+                if budget.expired:
+                    break
+            if is_better_result(level_best, result):
+                result = level_best
+            if level_best is not None or budget.expired:
+                break
+
+    if result is not None:
+        result['optimal'] = not budget.expired
+    return result
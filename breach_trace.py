@@ -0,0 +1,117 @@
+"""Instrumentierung: Zeitspannen der einzelnen Schritte und Zähler.
+
+Ein Trace sammelt benannte Spans (Start, Dauer, Thread, Argumente) und
+Zähler, z.B. die Solver-Statistiken. Er lässt sich als Text zusammenfassen,
+als JSON exportieren oder im Chrome-Trace-Format (chrome://tracing,
+Perfetto) speichern. NULL_TRACE ist ein Trace, der nichts aufzeichnet,
+damit instrumentierter Code ohne Fallunterscheidung auskommt.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+
+class Trace:
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.spans = []
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def span(self, name: str, **args):
+        """Misst die Dauer des with-Blocks."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_span(name, start, time.perf_counter(), **args)
+
+    def add_span(self, name: str, start: float, end: float, **args):
+        """Fügt eine Spanne mit perf_counter-Zeitpunkten hinzu (z.B. extern gemessen)."""
+        with self._lock:
+            self.spans.append((name, start, end, threading.get_ident(), args))
+
+    def count(self, name: str, value: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def update(self, counters: Dict, prefix: str = ""):
+        """
+        Übernimmt numerische Einträge eines stats-Dicts als Zähler. Einträge
+        'max_*' werden über mehrere Aufrufe maximiert statt summiert.
+        """
+        for name, value in counters.items():
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                continue
+            if name.startswith("max_"):
+                with self._lock:
+                    key = prefix + name
+                    self.counters[key] = max(self.counters.get(key, value), value)
+            else:
+                self.count(prefix + name, value)
+
+    def totals(self) -> Dict[str, Dict]:
+        """Anzahl und Gesamtdauer (ms) pro Span-Name in Reihenfolge des ersten Auftretens."""
+        totals = {}
+        for name, start, end, _, _ in self.spans:
+            entry = totals.setdefault(name, {'count': 0, 'total_ms': 0.0})
+            entry['count'] += 1
+            entry['total_ms'] += (end - start) * 1000
+        return totals
+
+    def summary(self) -> str:
+        lines = [f"{'Schritt':28} {'Anzahl':>6} {'Gesamt ms':>10}"]
+        for name, entry in self.totals().items():
+            lines.append(f"{name:28} {entry['count']:6} {entry['total_ms']:10.2f}")
+        for name, value in self.counters.items():
+            lines.append(f"{name:28} {value:>17}")
+        return "\n".join(lines)
+
+    def to_dict(self) -> Dict:
+        return {
+            'spans': [{'name': name, 'start_ms': (start - self.origin) * 1000,
+                       'duration_ms': (end - start) * 1000, 'thread': thread, 'args': args}
+                      for name, start, end, thread, args in self.spans],
+            'counters': dict(self.counters),
+        }
+
+    def to_chrome(self) -> Dict:
+        """Chrome-Trace-Format: vollständige Events ('X') in Mikrosekunden plus Zähler."""
+        pid = os.getpid()
+        events = [{'name': name, 'ph': "X", 'ts': (start - self.origin) * 1e6, 'dur': (end - start) * 1e6,
+                   'pid': pid, 'tid': thread, 'args': args}
+                  for name, start, end, thread, args in self.spans]
+        end = max((span[2] for span in self.spans), default=self.origin)
+        events += [{'name': name, 'ph': "C", 'ts': (end - self.origin) * 1e6, 'pid': pid,
+                    'args': {'value': value}} for name, value in self.counters.items()]
+        return {'traceEvents': events, 'displayTimeUnit': "ms"}
+
+    def export(self, path: str, chrome: Optional[bool] = None):
+        """Speichert den Trace; chrome=None wählt das Chrome-Format für *.trace.json."""
+        if chrome is None:
+            chrome = path.endswith(".trace.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome() if chrome else self.to_dict(), f, indent=1)
+
+
+class _NullTrace(Trace):
+    """Zeichnet nichts auf."""
+
+    def span(self, name: str, **args):
+        return contextlib.nullcontext()
+
+    def add_span(self, name: str, start: float, end: float, **args):
+        pass
+
+    def count(self, name: str, value: float = 1):
+        pass
+
+    def update(self, counters: Dict, prefix: str = ""):
+        pass
+
+
+NULL_TRACE = _NullTrace()
@@ -0,0 +1,163 @@
+"""Watch-Modus: einen gemerkten Bildschirmbereich laufend beobachten und lösen.
+
+Jeder aufgenommene Frame wird auf einen kleinen Differenz-Hash reduziert.
+Die Erkennung läuft nur, wenn sich der Hash gegenüber dem zuletzt
+ausgewerteten Frame geändert hat und seit der letzten Aufnahme stabil ist
+(keine Übergangs-Animation). Ein neu erkanntes Puzzle wird automatisch
+gelöst. Die Pause zwischen zwei Aufnahmen richtet sich nach der gemessenen
+Arbeitszeit, sodass die Schleife im Mittel höchstens den Anteil cpu_budget
+einer CPU belegt.
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import cv2 as cv
+import numpy as np
+
+from cv2_tmm import detect_breach_protocol_data, to_grayscale
+from breach_hack import solve_breach_protocol, format_solution, BUFFER_SIZE, TIME_BUDGET_MS
+from breach_cache import SolutionCache
+from snipping import SnippingTool, capture_region
+
+# Kantenlänge des verkleinerten Bildes für den Hash (16x16 = 256 Bit)
+HASH_SIZE = 16
+# Abweichende Hash-Bits, die noch als "unverändert" gelten (Rauschen, blinkender Cursor)
+HASH_TOLERANCE = 8
+# Maximaler CPU-Anteil der Aufnahmeschleife und kürzester Abstand zweier Aufnahmen (s)
+CPU_BUDGET = 0.1
+MIN_INTERVAL = 0.25
+
+
+def frame_hash(frame: np.ndarray, size: int = HASH_SIZE) -> np.ndarray:
+    """Differenz-Hash: Helligkeitsverlauf des auf size x size verkleinerten Frames als Bits."""
+    small = to_grayscale(cv.resize(frame, (size + 1, size), interpolation=cv.INTER_AREA))
+    return np.packbits(small[:, 1:] > small[:, :-1])
+
+
+def hash_distance(a: np.ndarray, b: np.ndarray) -> int:
+    """Anzahl unterschiedlicher Bits zweier Hashes."""
+    return int(np.unpackbits(a ^ b).sum())
+
+
+class BreachWatcher:
+    """
+    Beobachtet region = (x, y, Breite, Höhe) und ruft on_solution(matrix,
+    sequences, result) für jedes neu erkannte Puzzle auf. run() blockiert bis
+    stop(), typischerweise in einem eigenen Thread.
+    """
+
+    def __init__(self, region: Tuple[int, int, int, int],
+                 on_solution: Callable[[List[List[str]], List[List[str]], Optional[Dict]], None],
+                 buffer_size: int = BUFFER_SIZE, time_budget_ms: Optional[int] = TIME_BUDGET_MS,
+                 screen_size: Optional[Tuple[int, int]] = None, hex_images_path: str = "hexcodes",
+                 cpu_budget: float = CPU_BUDGET, min_interval: float = MIN_INTERVAL,
+                 capture: Callable[[Tuple[int, int, int, int]], np.ndarray] = capture_region,
+                 cache: Optional[SolutionCache] = None):
+        self.region = region
+        self.on_solution = on_solution
+        self.buffer_size = buffer_size
+        self.time_budget_ms = time_budget_ms
+        self.screen_size = screen_size
+        self.hex_images_path = hex_images_path
+        self.cpu_budget = cpu_budget
+        self.min_interval = min_interval
+        self.capture = capture
+        self.cache = cache
+
+        self.stop_event = threading.Event()
+        self.stats = {'frames': 0, 'skipped': 0, 'detections': 0, 'solves': 0, 'busy_s': 0.0}
+        self._last_hash = None      # Hash der vorigen Aufnahme
+        self._handled_hash = None   # Hash des zuletzt ausgewerteten Frames
+        self._last_puzzle = None    # Zuletzt gelöstes Puzzle (matrix, sequences)
+
+    def step(self) -> bool:
+        """Nimmt einen Frame auf und wertet ihn bei Bedarf aus. True, wenn die Erkennung lief."""
+        frame = self.capture(self.region)
+        self.stats['frames'] += 1
+
+        current = frame_hash(frame)
+        stable = self._last_hash is not None and hash_distance(current, self._last_hash) <= HASH_TOLERANCE
+        changed = self._handled_hash is None or hash_distance(current, self._handled_hash) > HASH_TOLERANCE
+        self._last_hash = current
+        if not (stable and changed):
+            self.stats['skipped'] += 1
+            return False
+
+        self._handled_hash = current
+        self.stats['detections'] += 1
+        with contextlib.redirect_stdout(io.StringIO()):
+            matrix, sequences = detect_breach_protocol_data(frame, self.hex_images_path,
+                                                            screen_size=self.screen_size)
+        if not matrix or not sequences:
+            # Kein Breach-Bildschirm: dasselbe Puzzle später erneut lösen
+            self._last_puzzle = None
+            return True
+        if (matrix, sequences) == self._last_puzzle:
+            return True
+
+        self._last_puzzle = (matrix, sequences)
+        result = solve_breach_protocol(matrix, sequences, self.buffer_size,
+                                       time_budget_ms=self.time_budget_ms, anytime=True, cache=self.cache)
+        self.stats['solves'] += 1
+        self.on_solution(matrix, sequences, result)
+        return True
+
+    def run(self):
+        """Aufnahmeschleife bis stop()."""
+        while not self.stop_event.is_set():
+            start = time.perf_counter()
+            self.step()
+            busy = time.perf_counter() - start
+            self.stats['busy_s'] += busy
+            # Pause so wählen, dass busy / (busy + pause) <= cpu_budget
+            pause = max(self.min_interval - busy, busy * (1 / self.cpu_budget - 1))
+            self.stop_event.wait(pause)
+
+    def stop(self):
+        self.stop_event.set()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Breach Protocol im Watch-Modus lösen")
+    parser.add_argument("--region", type=int, nargs=4, metavar=("X", "Y", "W", "H"),
+                        help="Beobachteter Bereich (Standard: einmalig mit dem Snipping-Tool wählen)")
+    parser.add_argument("--buffer", type=int, default=BUFFER_SIZE)
+    parser.add_argument("--budget", type=int, default=TIME_BUDGET_MS, help="Zeitlimit pro Lösung (ms)")
+    parser.add_argument("--cpu-budget", type=float, default=CPU_BUDGET)
+    parser.add_argument("--interval", type=float, default=MIN_INTERVAL)
+    args = parser.parse_args()
+
+    region, screen_size = args.region, None
+    if region is None:
+        snipping_tool = SnippingTool()
+        snipping_tool.run()
+        region, screen_size = snipping_tool.region, snipping_tool.screen_size
+    if region is None:
+        print("Kein Bereich ausgewählt!")
+        return
+
+    def on_solution(matrix, sequences, result):
+        if result:
+            print(format_solution(result, matrix))
+        else:
+            print("Keine Lösung gefunden!")
+        print()
+
+    watcher = BreachWatcher(tuple(region), on_solution, args.buffer, args.budget, screen_size=screen_size,
+                            cpu_budget=args.cpu_budget, min_interval=args.interval, cache=SolutionCache())
+    print(f"Beobachte Bereich {tuple(region)} - Abbruch mit Strg+C")
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        watcher.stop()
+    stats = watcher.stats
+    print(f"{stats['frames']} Frames, {stats['skipped']} übersprungen, "
+          f"{stats['detections']} Erkennungen, {stats['solves']} Lösungen")
+
+
+if __name__ == "__main__":
+    main()
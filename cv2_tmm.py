@@ -1,17 +1,341 @@
 import cv2 as cv
 import numpy as np
+import hashlib
+import json
 import os
-from matplotlib import pyplot as plt
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from breach_cache import image_fingerprint
+from breach_trace import NULL_TRACE
+
+VALID_HEX_VALUES = ["55", "1C", "BD", "E9", "7A", "FF"]
+TEMPLATE_KINDS = ("matrix", "sequence")
+TEMPLATE_CACHE_FILE = "templates.npz"
+DETECTION_MODES = ("full", "grid")
+# Grid mode: downscale factor of the coarse locating pass and the search
+# margin (pixels) around each predicted cell center
+COARSE_SCALE = 0.5
+CELL_MARGIN = 3
+# Per-resolution detector settings (panel layout, template scale), stored next to the templates
+RESOLUTION_CACHE_FILE = "resolution_cache.json"
+# Template scales tried when calibrating a new resolution (1.0 = as captured,
+# 1.33 ~ 1440p and 2.0 ~ 4K relative to 1080p templates)
+SCALE_PYRAMID = (0.5, 0.67, 0.75, 0.83, 0.9, 1.0, 1.1, 1.2, 1.33, 1.5, 1.75, 2.0)
+# A frame without matrix hits still looks like a breach screen (at a wrong
+# scale) if its best matrix response reaches RECALIBRATION_HINT; after
+# RECALIBRATION_MISSES such frames the scale is calibrated again, every
+# calibration that does not find the matrix doubles that number
+RECALIBRATION_HINT = 0.5
+RECALIBRATION_MISSES = 3
+
+class TemplateBank:
+    """
+    Grayscale hex-code templates for the matrix and sequence panels.
+    Loaded once per process (see get_template_bank) and shared by all detectors.
+    With use_cache=True the templates are read from / written to a compact
+    .npz file next to the PNGs, which is refreshed when a PNG is newer.
+    """
+    def __init__(self, hex_images_path="hexcodes", codes=VALID_HEX_VALUES, use_cache=False, templates=None):
+        self.hex_images_path = hex_images_path
+        self.codes = list(codes)
+        self.templates = {kind: {} for kind in TEMPLATE_KINDS}
+        self._scaled = {}
+        self._stacked = {}
+        self._pyramid = {}
+        self._signature = None
+
+        if templates is not None:
+            self.templates = templates
+            return
+
+        cache_path = os.path.join(hex_images_path, TEMPLATE_CACHE_FILE)
+        if use_cache and self._cache_is_fresh(cache_path):
+            with np.load(cache_path) as data:
+                for kind in TEMPLATE_KINDS:
+                    for code in self.codes:
+                        self.templates[kind][code] = data[f"{kind}_{code}"]
+            return
+
+        for kind in TEMPLATE_KINDS:
+            for code in self.codes:
+                template_path = self._png_path(kind, code)
+                template = cv.imread(template_path, cv.IMREAD_GRAYSCALE)
+                assert template is not None, f"Template {code} could not be loaded from {template_path}"
+                self.templates[kind][code] = template
+
+        if use_cache:
+            np.savez_compressed(cache_path, **{
+                f"{kind}_{code}": template
+                for kind in TEMPLATE_KINDS for code, template in self.templates[kind].items()
+            })
+
+    def _png_path(self, kind, code):
+        return os.path.join(self.hex_images_path, kind, f"{code}.png")
+
+    def _cache_is_fresh(self, cache_path):
+        if not os.path.exists(cache_path):
+            return False
+        cache_mtime = os.path.getmtime(cache_path)
+        return all(os.path.getmtime(self._png_path(kind, code)) <= cache_mtime
+                   for kind in TEMPLATE_KINDS for code in self.codes)
+
+    def get(self, kind):
+        """Return {code: template} for 'matrix' or 'sequence'"""
+        return self.templates[kind]
+
+    def signature(self):
+        """Hash of all template pixels, identifies the template set (e.g. for result caches)"""
+        if self._signature is None:
+            digest = hashlib.sha1()
+            for kind in TEMPLATE_KINDS:
+                for code in sorted(self.templates[kind]):
+                    template = self.templates[kind][code]
+                    digest.update(f"{kind}/{code}{template.shape}".encode())
+                    digest.update(np.ascontiguousarray(template).data)
+            self._signature = digest.hexdigest()
+        return self._signature
+
+    def size(self, kind, code):
+        """Return (width, height) of a template"""
+        h, w = self.templates[kind][code].shape
+        return w, h
+
+    def scaled(self, kind, scale):
+        """Return {code: template} resized by scale (cached)"""
+        key = (kind, scale)
+        if key not in self._scaled:
+            self._scaled[key] = {
+                code: cv.resize(template, None, fx=scale, fy=scale, interpolation=cv.INTER_AREA)
+                for code, template in self.templates[kind].items()
+            }
+        return self._scaled[key]
+
+    def at_scale(self, scale):
+        """
+        Return a TemplateBank with all templates resized by scale. Banks for
+        the scales of the pyramid are built once and kept.
+        """
+        if scale == 1.0:
+            return self
+        if scale not in self._pyramid:
+            interpolation = cv.INTER_AREA if scale < 1 else cv.INTER_CUBIC
+            templates = {
+                kind: {code: cv.resize(template, None, fx=scale, fy=scale, interpolation=interpolation)
+                       for code, template in self.templates[kind].items()}
+                for kind in TEMPLATE_KINDS
+            }
+            self._pyramid[scale] = TemplateBank(self.hex_images_path, self.codes, templates=templates)
+        return self._pyramid[scale]
+
+    def stacked(self, kind, codes):
+        """
+        Return (matrix, h, w): all templates center-cropped to the smallest
+        common size, flattened, zero-mean and unit-norm, one row per code.
+        Used for batched normalized cross-correlation of grid cells.
+        """
+        key = (kind, tuple(codes))
+        if key not in self._stacked:
+            templates = [self.templates[kind][code] for code in codes]
+            h = min(t.shape[0] for t in templates)
+            w = min(t.shape[1] for t in templates)
+            rows = []
+            for t in templates:
+                y0, x0 = (t.shape[0] - h) // 2, (t.shape[1] - w) // 2
+                rows.append(t[y0:y0 + h, x0:x0 + w].astype(np.float32).ravel())
+            stacked = np.stack(rows)
+            stacked -= stacked.mean(axis=1, keepdims=True)
+            stacked /= np.linalg.norm(stacked, axis=1, keepdims=True)
+            self._stacked[key] = (stacked, h, w)
+        return self._stacked[key]
+
+# One bank per template folder and process; the lock lets a warm-up thread
+# and a detection load the same bank only once
+_TEMPLATE_BANKS = {}
+_TEMPLATE_BANKS_LOCK = threading.Lock()
+
+def get_template_bank(hex_images_path="hexcodes", use_cache=False):
+    """Return the process-wide TemplateBank for hex_images_path, loading it on first use"""
+    key = os.path.abspath(hex_images_path)
+    with _TEMPLATE_BANKS_LOCK:
+        if key not in _TEMPLATE_BANKS:
+            _TEMPLATE_BANKS[key] = TemplateBank(hex_images_path, use_cache=use_cache)
+        return _TEMPLATE_BANKS[key]
+
+class ResolutionCache:
+    """
+    Small JSON store for per-resolution detector settings, keyed by
+    "WIDTHxHEIGHT" of the screenshot. Written through on every update,
+    atomically so that several processes can share the file.
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        # Per-process state that is never written (unconfirmed scale, miss counters)
+        self.sessions = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError):
+                self.entries = {}
+
+    @staticmethod
+    def key(shape):
+        """shape is (height, width, ...) of an image or screen"""
+        h, w = shape[:2]
+        return f"{w}x{h}"
+
+    def get(self, shape, name):
+        return self.entries.get(self.key(shape), {}).get(name)
+
+    def set(self, shape, name, value):
+        self.entries.setdefault(self.key(shape), {})[name] = value
+        self._write()
+
+    def session(self, shape):
+        """Mutable in-memory dict for shape"""
+        return self.sessions.setdefault(self.key(shape), {})
+
+    def discard(self, shape, name):
+        if self.entries.get(self.key(shape), {}).pop(name, None) is not None:
+            self._write()
+
+    def _write(self):
+        if self.path:
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(self.entries, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError:
+                pass
+
+# One cache per file and process
+_RESOLUTION_CACHES = {}
+
+def get_resolution_cache(hex_images_path="hexcodes"):
+    """Return the process-wide ResolutionCache stored in hex_images_path"""
+    path = os.path.abspath(os.path.join(hex_images_path, RESOLUTION_CACHE_FILE))
+    if path not in _RESOLUTION_CACHES:
+        _RESOLUTION_CACHES[path] = ResolutionCache(path)
+    return _RESOLUTION_CACHES[path]
+
+# Thread pools shared by all detectors: one per worker count for the
+# per-template matches, one for running the matrix and sequence passes side by side
+_MATCH_EXECUTORS = {}
+_PASS_EXECUTOR = None
+
+def get_match_executor(workers):
+    """Return the shared ThreadPoolExecutor with the given number of workers"""
+    if workers not in _MATCH_EXECUTORS:
+        _MATCH_EXECUTORS[workers] = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="match")
+    return _MATCH_EXECUTORS[workers]
+
+def get_pass_executor():
+    global _PASS_EXECUTOR
+    if _PASS_EXECUTOR is None:
+        _PASS_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pass")
+    return _PASS_EXECUTOR
+
+def to_grayscale(image):
+    """
+    Convert a captured frame to the single-channel image the detector works on.
+    Frames from the screen capture (pyautogui/PIL) are RGB or RGBA, 2D arrays
+    are taken as grayscale already.
+    """
+    if image.ndim == 2:
+        return image
+    if image.shape[2] == 4:
+        return cv.cvtColor(image, cv.COLOR_RGBA2GRAY)
+    return cv.cvtColor(image, cv.COLOR_RGB2GRAY)
+
+def stack_responses(responses):
+    """
+    Stack matchTemplate response maps of differently sized templates. Maps of
+    smaller templates are larger; the others are padded with -1 (the lowest
+    TM_CCOEFF_NORMED score) so that hits near the right/bottom border are kept.
+    Returns array of shape (len(responses), H, W).
+    """
+    h = max(res.shape[0] for res in responses)
+    w = max(res.shape[1] for res in responses)
+    stacked = np.full((len(responses), h, w), -1.0, dtype=np.float32)
+    for i, res in enumerate(responses):
+        stacked[i, :res.shape[0], :res.shape[1]] = res
+    return stacked
+
+def cluster_centers(values, tol, scores=None):
+    """
+    Group 1D coordinates into lattice lines (gap > tol starts a new line) and
+    return one coordinate per line: the best-scoring member if scores are
+    given, the mean otherwise. Gaps of two or three times the median pitch
+    are filled with the missing lines.
+    """
+    if not values:
+        return []
+    if scores is None:
+        scores = [None] * len(values)
+    points = sorted(zip(values, scores), key=lambda p: p[0])
+    groups = [[points[0]]]
+    for point in points[1:]:
+        if point[0] - groups[-1][-1][0] <= tol:
+            groups[-1].append(point)
+        else:
+            groups.append([point])
+    if scores[0] is None:
+        centers = [sum(v for v, _ in g) / len(g) for g in groups]
+    else:
+        centers = [max(g, key=lambda p: p[1])[0] for g in groups]
+    if len(centers) < 2:
+        return centers
+
+    pitch = float(np.median(np.diff(centers)))
+    filled = [centers[0]]
+    for c in centers[1:]:
+        steps = int(round((c - filled[-1]) / pitch))
+        if 2 <= steps <= 3:
+            filled.extend(filled[-1] + (c - filled[-1]) * k / steps for k in range(1, steps))
+        filled.append(c)
+    return filled
 
 class BreachProtocolDetector:
     def __init__(self, screenshot_path='screenshot/screenshot.png', 
-                 hex_images_path="hexcodes", threshold=0.8):
+                 hex_images_path="hexcodes", threshold=0.8, template_bank=None,
+                 detection_mode="full", multiscale=True, screen_size=None,
+                 workers=1, cv_threads=None, trace=None, offset=10, row_threshold=15,
+                 recalibrate=False):
         self.screenshot_path = screenshot_path
         self.HEX_IMAGES_PATH = hex_images_path
-        self.MATRIX = "/matrix/"
-        self.SEQUENCE = "/sequence/"
-        self.VALID_HEX_VALUES = ["55", "1C", "BD", "E9", "7A", "FF"]
+        self.MATRIX = "matrix"
+        self.SEQUENCE = "sequence"
+        self.VALID_HEX_VALUES = VALID_HEX_VALUES
         self.threshold = threshold
+        # Minimum distance between two hits and maximum y difference within a
+        # grid row, in pixels at template scale 1.0
+        self.offset = offset
+        self.row_threshold = row_threshold
+        self.base_templates = template_bank or get_template_bank(hex_images_path)
+        self.templates = self.base_templates
+        # Template scale is calibrated once per screen resolution (or screenshot
+        # size if screen_size=(width, height) is unknown) and then reused
+        self.multiscale = multiscale
+        self.screen_size = screen_size
+        self.scale = 1.0
+        # Calibrate again even if a scale is cached (e.g. after changing the UI scaling)
+        self.recalibrate = recalibrate
+        # Best response of the last matchTemplate pass per kind
+        self.peak_scores = {}
+        assert detection_mode in DETECTION_MODES, f"Unknown detection mode {detection_mode}"
+        self.detection_mode = detection_mode
+        self.resolution_cache = get_resolution_cache(hex_images_path)
+        # workers > 1: matchTemplate calls (which release the GIL) run on a
+        # thread pool; results are collected in template order, so the grids
+        # are identical to the serial path. cv_threads sets OpenCV's own
+        # (process-wide) thread count, e.g. 1 to avoid oversubscription.
+        self.workers = workers
+        if cv_threads is not None:
+            cv.setNumThreads(cv_threads)
+        # Spans for every stage (breach_trace.Trace), recorded only if given
+        self.trace = trace or NULL_TRACE
         
         # Initialize data
         self.matrix_grid = None
@@ -20,8 +344,15 @@ class BreachProtocolDetector:
         self.output_img = None
         
     def load_screenshot(self):
-        """Load screenshot in grayscale"""
-        self.screenshot = cv.imread(self.screenshot_path, cv.IMREAD_GRAYSCALE)
+        """
+        Load screenshot in grayscale. screenshot_path may also be a captured
+        frame (NumPy array, see to_grayscale), which skips the PNG round-trip.
+        """
+        with self.trace.span("load_screenshot"):
+            if isinstance(self.screenshot_path, np.ndarray):
+                self.screenshot = to_grayscale(self.screenshot_path)
+            else:
+                self.screenshot = cv.imread(self.screenshot_path, cv.IMREAD_GRAYSCALE)
         assert self.screenshot is not None, "Screenshot could not be loaded"
         
         # Convert to BGR for visualization
@@ -64,72 +395,392 @@ class BreachProtocolDetector:
 
         return grid
 
-    def detect_hex_codes(self, base_img, valid_codes, templates_folder, offset=10):
+    def _match_all(self, base_img, templates):
+        """matchTemplate for every template, in order, on the thread pool if workers > 1"""
+        def match(template):
+            with self.trace.span("matchTemplate"):
+                return cv.matchTemplate(base_img, template, cv.TM_CCOEFF_NORMED)
+        if self.workers > 1:
+            return list(get_match_executor(self.workers).map(match, templates))
+        return [match(template) for template in templates]
+
+    def match_scores(self, base_img, valid_codes, kind):
+        """
+        Run matchTemplate for every code and stack the response maps
+        (see stack_responses). Returns array of shape (len(valid_codes), H, W).
+        """
+        templates = self.templates.get(kind)
+        scores = stack_responses(self._match_all(base_img, [templates[code] for code in valid_codes]))
+        self.peak_scores[kind] = float(scores.max())
+        return scores
+
+    def suppress_non_maxima(self, scores, valid_codes, offset=10, threshold=None):
         """
-        Detect hex codes in base_img using templates from templates_folder.
-        Returns list of (x, y, code) for detected positions.
+        Non-maximum suppression on stacked response maps.
+        Keeps, per location, the best-scoring code, then only local maxima
+        (via dilation with a (2*offset+1) window) above threshold. Remaining
+        ties are resolved greedily by score with a spatial hash so that no two
+        detections are closer than offset.
+        threshold defaults to self.threshold.
+        Returns list of (x, y, code) sorted top-to-bottom, left-to-right.
         """
+        if threshold is None:
+            threshold = self.threshold
+        best = scores.max(axis=0)
+        labels = scores.argmax(axis=0)
+        kernel = np.ones((2 * offset + 1, 2 * offset + 1), np.uint8)
+        peaks = (best >= threshold) & (best >= cv.dilate(best, kernel))
+        ys, xs = np.nonzero(peaks)
+
         found_positions = []
-        for hex_code in valid_codes:
-            template_path = os.path.join(templates_folder, f"{hex_code}.png")
-            template = cv.imread(template_path, cv.IMREAD_GRAYSCALE)
-            assert template is not None, f"Template {hex_code} could not be loaded from {template_path}"
-            w, h = template.shape[::-1]
+        buckets = {}
+        for i in np.argsort(-best[ys, xs], kind="stable"):
+            x, y = int(xs[i]), int(ys[i])
+            bx, by = x // offset, y // offset
+            neighbours = (buckets.get((bx + dx, by + dy), ()) for dx in (-1, 0, 1) for dy in (-1, 0, 1))
+            if any((x - px) ** 2 + (y - py) ** 2 <= offset ** 2 for cell in neighbours for px, py in cell):
+                continue
+            buckets.setdefault((bx, by), []).append((x, y))
+            found_positions.append((x, y, valid_codes[labels[y, x]]))
+
+        found_positions.sort(key=lambda p: (p[1], p[0]))
+        return found_positions
+
+    def locate_grid(self, base_img, valid_codes, kind, offset=10):
+        """
+        Coarse pass for grid mode: match downscaled templates on a downscaled
+        image at a relaxed threshold and fit the lattice of cell centers.
+        Returns (column_centers, row_centers) in full-resolution pixels.
+        """
+        small = cv.resize(base_img, None, fx=COARSE_SCALE, fy=COARSE_SCALE, interpolation=cv.INTER_AREA)
+        templates = self.templates.scaled(kind, COARSE_SCALE)
+        scores = stack_responses(self._match_all(small, [templates[code] for code in valid_codes]))
+        self.peak_scores[kind] = float(scores.max())
 
-            res = cv.matchTemplate(base_img, template, cv.TM_CCOEFF_NORMED)
-            loc = np.where(res >= self.threshold)
+        hits = self.suppress_non_maxima(scores, valid_codes, max(1, int(offset * COARSE_SCALE)),
+                                        threshold=self.threshold - 0.1)
 
-            for pt in zip(*loc[::-1]):
-                # filter out points too close to existing detections
-                if all(np.linalg.norm(np.array(pt) - np.array(pos[:2])) > offset for pos in found_positions):
-                    found_positions.append((pt[0], pt[1], hex_code))
+        best = scores.max(axis=0)
+        xs, ys, hit_scores = [], [], []
+        for x, y, code in hits:
+            w, h = self.templates.size(kind, code)
+            xs.append(x / COARSE_SCALE + w / 2)
+            ys.append(y / COARSE_SCALE + h / 2)
+            hit_scores.append(float(best[y, x]))
+        return cluster_centers(xs, offset, hit_scores), cluster_centers(ys, offset, hit_scores)
 
+    def classify_cells(self, base_img, valid_codes, kind, columns, rows, margin=CELL_MARGIN):
+        """
+        Classify every lattice cell in one batched operation: each cell window
+        (common template size plus margin) is compared at every shift against
+        all stacked templates via normalized cross-correlation. Cells whose
+        best score is below threshold are treated as empty.
+        Returns list of (x, y, code) with template top-left positions.
+        """
+        stacked, h, w = self.templates.stacked(kind, valid_codes)
+        centers = [(cx, cy) for cy in rows for cx in columns]
+        if not centers:
+            return []
+
+        pad = max(h, w) + margin
+        padded = cv.copyMakeBorder(base_img, pad, pad, pad, pad, cv.BORDER_REPLICATE).astype(np.float32)
+        windows = []
+        for cx, cy in centers:
+            x0 = int(round(cx - w / 2)) - margin + pad
+            y0 = int(round(cy - h / 2)) - margin + pad
+            windows.append(padded[y0:y0 + h + 2 * margin, x0:x0 + w + 2 * margin])
+        windows = np.stack(windows)
+
+        # (cells, shifts, pixels): every shifted patch, zero-mean and unit-norm
+        patches = np.lib.stride_tricks.sliding_window_view(windows, (h, w), axis=(1, 2))
+        patches = patches.reshape(len(centers), -1, h * w)
+        patches = patches - patches.mean(axis=2, keepdims=True)
+        norms = np.linalg.norm(patches, axis=2, keepdims=True)
+        norms[norms == 0] = 1
+        patches /= norms
+
+        scores = (patches @ stacked.T).max(axis=1)
+        labels = scores.argmax(axis=1)
+        best = scores.max(axis=1)
+
+        found_positions = []
+        for (cx, cy), label, score in zip(centers, labels, best):
+            if score < self.threshold:
+                continue
+            code = valid_codes[label]
+            tw, th = self.templates.size(kind, code)
+            found_positions.append((int(round(cx - tw / 2)), int(round(cy - th / 2)), code))
         return found_positions
-    
+
+    def detect_hex_codes(self, base_img, valid_codes, kind, offset=10, roi=None):
+        """
+        Detect hex codes in base_img using the 'matrix' or 'sequence' templates.
+        In "grid" mode the grid is located by a coarse pass and each cell is
+        classified directly instead of matching templates over the full image.
+        roi=(x0, y0, x1, y1) restricts the search to a view of base_img.
+        Returns list of (x, y, code) for detected positions in base_img coordinates.
+        """
+        with self.trace.span(f"detect {kind}", roi=roi is not None):
+            x0, y0 = 0, 0
+            if roi is not None:
+                x0, y0, x1, y1 = roi
+                base_img = base_img[y0:y1, x0:x1]
+                # The view must still fit every template
+                max_w = max(self.templates.size(kind, code)[0] for code in valid_codes)
+                max_h = max(self.templates.size(kind, code)[1] for code in valid_codes)
+                if base_img.shape[0] < max_h or base_img.shape[1] < max_w:
+                    return []
+
+            if self.detection_mode == "grid":
+                with self.trace.span("locate_grid", kind=kind):
+                    columns, rows = self.locate_grid(base_img, valid_codes, kind, offset)
+                with self.trace.span("classify_cells", kind=kind):
+                    found_positions = self.classify_cells(base_img, valid_codes, kind, columns, rows)
+            else:
+                scores = self.match_scores(base_img, valid_codes, kind)
+                with self.trace.span("non_maximum_suppression", kind=kind):
+                    found_positions = self.suppress_non_maxima(scores, valid_codes, offset)
+            return [(x + x0, y + y0, code) for x, y, code in found_positions]
+
+    def panel_layout(self, matrix_positions, row_threshold=15):
+        """
+        Derive the panel ROIs from the matrix detections: the matrix panel is
+        the bounding box of the hits plus one cell pitch of margin on every
+        side, the daemon (sequence) panel is everything to the right of it,
+        below the panel headers (which start level with the matrix panel).
+        Returns {"matrix": [x0, y0, x1, y1], "sequence": [x0, y0, x1, y1],
+        "pitch": [px, py]}.
+        """
+        img_h, img_w = self.screenshot.shape[:2]
+        margin_w = max(self.templates.size(self.MATRIX, code)[0] for code in self.VALID_HEX_VALUES)
+        margin_h = max(self.templates.size(self.MATRIX, code)[1] for code in self.VALID_HEX_VALUES)
+        xs = [x for x, _, _ in matrix_positions]
+        ys = [y for _, y, _ in matrix_positions]
+        # Cell pitch from the hit lattice; a single column/row falls back to two templates
+        pitch = []
+        for values, size in ((xs, margin_w), (ys, margin_h)):
+            centers = cluster_centers(values, row_threshold)
+            pitch.append(float(np.median(np.diff(centers))) if len(centers) > 1 else 2.0 * size)
+        pitch_x, pitch_y = (int(round(p)) for p in pitch)
+        matrix_roi = [max(0, min(xs) - pitch_x), max(0, min(ys) - pitch_y),
+                      min(img_w, max(xs) + margin_w + pitch_x), min(img_h, max(ys) + margin_h + pitch_y)]
+        sequence_roi = [matrix_roi[2], matrix_roi[1], img_w, img_h]
+        return {self.MATRIX: matrix_roi, self.SEQUENCE: sequence_roi, "pitch": [pitch_x, pitch_y]}
+
+    def roi_complete(self, positions, roi, pitch, kind):
+        """
+        A matrix pass restricted to the cached ROI is only trusted if no hit lies
+        within one cell pitch of an ROI edge inside the image: such a hit
+        suggests that the panel moved or grew and further cells were cut off.
+        """
+        img_h, img_w = self.screenshot.shape[:2]
+        x0, y0, x1, y1 = roi
+        pitch_x, pitch_y = pitch
+        for x, y, code in positions:
+            w, h = self.templates.size(kind, code)
+            if (x0 > 0 and x - x0 < pitch_x) or (y0 > 0 and y - y0 < pitch_y):
+                return False
+            if (x1 < img_w and x1 - (x + w) < pitch_x) or (y1 < img_h and y1 - (y + h) < pitch_y):
+                return False
+        return True
+
+    def resolution_shape(self):
+        """(height, width) used as key for the scale calibration"""
+        if self.screen_size is not None:
+            return self.screen_size[1], self.screen_size[0]
+        return self.screenshot.shape[:2]
+
+    def calibrate_scale(self, scales=SCALE_PYRAMID):
+        """
+        Find the template scale that matches this screenshot best: every scale
+        of the pyramid is tried with the matrix templates and the one with the
+        highest mean peak response over all codes wins.
+        Returns (scale, mean peak response).
+        """
+        img_h, img_w = self.screenshot.shape[:2]
+        best_scale, best_score = 1.0, -1.0
+        for scale in scales:
+            templates = self.base_templates.at_scale(scale).get(self.MATRIX)
+            templates = [templates[code] for code in self.VALID_HEX_VALUES]
+            if any(t.shape[0] > img_h or t.shape[1] > img_w for t in templates):
+                continue
+            score = float(np.mean([res.max() for res in self._match_all(self.screenshot, templates)]))
+            if score > best_score:
+                best_scale, best_score = scale, score
+        return best_scale, best_score
+
+    def apply_scale(self):
+        """
+        Use the cached scale for this resolution, calibrating it on first use
+        (or on request). Until a calibration is confirmed, its scale is kept
+        for this process instead of calibrating on every frame.
+        Returns (scale, mean peak response) if calibrated now, None otherwise;
+        the caller stores it via update_scale once the matrix was found.
+        """
+        if not self.multiscale:
+            return None
+        shape = self.resolution_shape()
+        session = self.resolution_cache.session(shape)
+        calibrated = None
+        scale = self.resolution_cache.get(shape, "scale")
+        if scale is None:
+            scale = session.get("scale")
+        if scale is None or self.recalibrate:
+            with self.trace.span("calibrate_scale"):
+                calibrated = self.calibrate_scale()
+            scale = session["scale"] = calibrated[0]
+            session["misses"] = 0
+        self.set_scale(scale)
+        return calibrated
+
+    def set_scale(self, scale):
+        self.scale = scale
+        self.templates = self.base_templates.at_scale(scale)
+
+    def update_scale(self, found_positions_matrix, calibrated):
+        """
+        Keep the resolution cache's scale in line with the matrix pass. A fresh
+        calibration is only stored if its mean peak reaches the threshold and
+        the matrix was found with it. Frames without matrix only count towards
+        a new calibration while no scale is stored or if they still look like
+        a breach screen (see RECALIBRATION_HINT), so menus do not recalibrate.
+        Returns (scale, mean peak response) if that switched to a clearly
+        better scale, which the caller should try once on this frame and pass
+        back here; None otherwise.
+        """
+        shape = self.resolution_shape()
+        session = self.resolution_cache.session(shape)
+        if found_positions_matrix:
+            session["misses"] = 0
+            session["patience"] = RECALIBRATION_MISSES
+            if calibrated is not None and calibrated[1] >= self.threshold:
+                self.resolution_cache.set(shape, "scale", calibrated[0])
+                print(f"Calibrated template scale {calibrated[0]} for {ResolutionCache.key(shape)}.")
+            return None
+        if calibrated is not None:
+            return None
+        stored = self.resolution_cache.get(shape, "scale") is not None
+        if stored and self.peak_scores.get(self.MATRIX, 0.0) < RECALIBRATION_HINT:
+            return None
+        session["misses"] = session.get("misses", 0) + 1
+        patience = session.get("patience", RECALIBRATION_MISSES)
+        if session["misses"] < patience:
+            return None
+        session["misses"] = 0
+        session["patience"] = 2 * patience
+        with self.trace.span("calibrate_scale"):
+            scale, score = self.calibrate_scale()
+        if score < self.threshold or scale == self.scale:
+            return None
+        # Scale no longer fits (e.g. UI scaling changed)
+        session["scale"] = scale
+        self.set_scale(scale)
+        return scale, score
+
+    def pixel_distances(self):
+        """(offset, row_threshold) at the current template scale; both were tuned at 1.0"""
+        return max(1, int(round(self.offset * self.scale))), self.row_threshold * self.scale
+
+    def detect_matrix(self, offset, row_threshold):
+        """
+        Matrix pass, within the cached panel layout if it yields a clearly
+        complete matrix, otherwise over the full screenshot.
+        Returns (positions, layout or None, future of the sequence pass or None).
+        """
+        # Reuse the panel layout of an earlier screenshot with the same resolution
+        layout = self.resolution_cache.get(self.screenshot.shape, "layout")
+        if layout and "pitch" not in layout:
+            # Written by an older version without margin for validation
+            layout = None
+        found_positions_matrix = []
+        sequence_future = None
+        if layout and self.workers > 1:
+            # Layout known: the sequence pass does not depend on the matrix pass
+            sequence_future = get_pass_executor().submit(
+                self.detect_hex_codes, self.screenshot, self.VALID_HEX_VALUES, self.SEQUENCE, offset,
+                roi=layout[self.SEQUENCE]
+            )
+        if layout:
+            found_positions_matrix = self.detect_hex_codes(
+                self.screenshot, self.VALID_HEX_VALUES, self.MATRIX, offset, roi=layout[self.MATRIX]
+            )
+            # Only a clearly complete matrix is accepted: hits at the ROI edge or
+            # rows of different length mean the panel moved or grew
+            row_lengths = {len(row) for row in self.build_grid(found_positions_matrix, row_threshold)}
+            if len(row_lengths) > 1 or not self.roi_complete(
+                    found_positions_matrix, layout[self.MATRIX], layout["pitch"], self.MATRIX):
+                found_positions_matrix = []
+        if not found_positions_matrix:
+            layout = None
+            if sequence_future is not None:
+                sequence_future.result()
+                sequence_future = None
+            found_positions_matrix = self.detect_hex_codes(
+                self.screenshot, self.VALID_HEX_VALUES, self.MATRIX, offset
+            )
+        return found_positions_matrix, layout, sequence_future
+
     def detect_and_build_grids(self, visualize=False):
         """Main method to detect hex codes and build grids"""
         if self.screenshot is None:
             self.load_screenshot()
+        calibrated = self.apply_scale()
             
         # Generate colors for visualization
         np.random.seed(42)
         colors = {code: tuple(int(c) for c in np.random.randint(0, 255, 3)) for code in self.VALID_HEX_VALUES}
         
         # --- Detect MATRIX hex codes ---
-        found_positions_matrix = self.detect_hex_codes(
-            self.screenshot, self.VALID_HEX_VALUES, self.HEX_IMAGES_PATH + self.MATRIX
-        )
+        offset, row_threshold = self.pixel_distances()
+        found_positions_matrix, layout, sequence_future = self.detect_matrix(offset, row_threshold)
+        recalibrated = self.update_scale(found_positions_matrix, calibrated) if self.multiscale else None
+        if recalibrated is not None:
+            # Another scale fits better: one more try on this frame, stored if it finds the matrix
+            offset, row_threshold = self.pixel_distances()
+            found_positions_matrix, layout, sequence_future = self.detect_matrix(offset, row_threshold)
+            self.update_scale(found_positions_matrix, recalibrated)
         print(f"Detected {len(found_positions_matrix)} hex codes in MATRIX area.")
+        if found_positions_matrix and layout is None:
+            layout = self.panel_layout(found_positions_matrix, row_threshold)
+            self.resolution_cache.set(self.screenshot.shape, "layout", layout)
 
         # Draw MATRIX detections
         for x, y, code in found_positions_matrix:
-            template_path = os.path.join(self.HEX_IMAGES_PATH + self.MATRIX, f"{code}.png")
-            template = cv.imread(template_path, cv.IMREAD_GRAYSCALE)
-            w, h = template.shape[::-1]
+            w, h = self.templates.size(self.MATRIX, code)
             cv.rectangle(self.output_img, (x, y), (x + w, y + h), colors[code], 2)
             cv.putText(self.output_img, "M:" + code, (x, y - 5), cv.FONT_HERSHEY_SIMPLEX, 0.5, colors[code], 1, cv.LINE_AA)
 
-        self.matrix_grid = self.build_grid(found_positions_matrix)
+        with self.trace.span("build_grid", kind=self.MATRIX):
+            self.matrix_grid = self.build_grid(found_positions_matrix, row_threshold)
         print("MATRIX GRID:")
         for row in self.matrix_grid:
             print(row)
 
         # --- Detect SEQUENCE hex codes ---
-        found_positions_sequence = self.detect_hex_codes(
-            self.screenshot, self.VALID_HEX_VALUES, self.HEX_IMAGES_PATH + self.SEQUENCE
-        )
+        if sequence_future is not None:
+            found_positions_sequence = sequence_future.result()
+        else:
+            found_positions_sequence = self.detect_hex_codes(
+                self.screenshot, self.VALID_HEX_VALUES, self.SEQUENCE, offset,
+                roi=layout[self.SEQUENCE] if layout else None
+            )
+        # The sequence ROI borders the validated matrix panel and the image edges,
+        # so only an empty result hints at a changed layout
+        if layout and not found_positions_sequence:
+            found_positions_sequence = self.detect_hex_codes(
+                self.screenshot, self.VALID_HEX_VALUES, self.SEQUENCE, offset
+            )
         print(f"Detected {len(found_positions_sequence)} hex codes in SEQUENCE area.")
 
         # Draw SEQUENCE detections (different color - e.g. white)
         for x, y, code in found_positions_sequence:
-            template_path = os.path.join(self.HEX_IMAGES_PATH + self.SEQUENCE, f"{code}.png")
-            template = cv.imread(template_path, cv.IMREAD_GRAYSCALE)
-            w, h = template.shape[::-1]
+            w, h = self.templates.size(self.SEQUENCE, code)
             # Use a fixed color for SEQUENCE (e.g., white)
             cv.rectangle(self.output_img, (x, y), (x + w, y + h), (255, 255, 255), 2)
             cv.putText(self.output_img, "S:" + code, (x, y - 5), cv.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1, cv.LINE_AA)
 
-        self.sequence_grid = self.build_grid(found_positions_sequence)
+        with self.trace.span("build_grid", kind=self.SEQUENCE):
+            self.sequence_grid = self.build_grid(found_positions_sequence, row_threshold)
         print("SEQUENCE GRID:")
         for row in self.sequence_grid:
             print(row)
@@ -142,6 +793,8 @@ class BreachProtocolDetector:
     
     def show_detections(self):
         """Show all detections using matplotlib"""
+        # matplotlib is only needed here, importing it costs most of the module's start-up time
+        from matplotlib import pyplot as plt
         plt.figure(figsize=(15, 10))
         plt.imshow(cv.cvtColor(self.output_img, cv.COLOR_BGR2RGB))
         plt.title("Detected Hex Codes: MATRIX (colors) & SEQUENCE (white)")
@@ -162,13 +815,35 @@ class BreachProtocolDetector:
 
 # Convenience functions for backward compatibility and easy import
 def detect_breach_protocol_data(screenshot_path='images/breach_protocol_screenshot.png', 
-                               hex_images_path="hexcodes", threshold=0.8, visualize=False):
+                               hex_images_path="hexcodes", threshold=0.8, visualize=False,
+                               detection_mode="full", multiscale=True, screen_size=None,
+                               workers=1, cache=None, trace=None):
     """
-    Convenience function to detect and return matrix and sequences
+    Convenience function to detect and return matrix and sequences.
+    screenshot_path is a file path or a captured frame as NumPy array.
+    cache (breach_cache.DetectionCache) returns the grids of an identical
+    image without running the detection again. trace (breach_trace.Trace)
+    records the stage timings.
     Returns: (matrix_grid, sequence_grid)
     """
-    detector = BreachProtocolDetector(screenshot_path, hex_images_path, threshold)
-    return detector.detect_and_build_grids(visualize=visualize)
+    key = None
+    if cache is not None and not visualize:
+        # Other or changed templates must not return grids detected with the old ones
+        key = image_fingerprint(screenshot_path, threshold=threshold, detection_mode=detection_mode,
+                                multiscale=multiscale, screen_size=screen_size,
+                                hex_images_path=os.path.abspath(hex_images_path),
+                                templates=get_template_bank(hex_images_path).signature())
+        grids = cache.get(key)
+        if grids is not None:
+            return tuple(grids)
+    detector = BreachProtocolDetector(screenshot_path, hex_images_path, threshold,
+                                      detection_mode=detection_mode, multiscale=multiscale,
+                                      screen_size=screen_size, workers=workers, trace=trace)
+    grids = detector.detect_and_build_grids(visualize=visualize)
+    # Failed detections are not stored: they may succeed after recalibration
+    if key is not None and grids[0] and grids[1]:
+        cache.set(key, grids)
+    return grids
 
 # For direct execution (backward compatibility)
 if __name__ == "__main__":
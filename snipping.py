@@ -1,17 +1,35 @@
+import time
 import tkinter as tk
-import pyautogui
+import numpy as np
 
 SCREENSHOT_PATH = "./screenshot/"
 NAME = "screenshot.png"
 HEXCODES = "./hexcodes/"
 MATRIX = HEXCODES + "matrix/"
 SEQUENCE = HEXCODES + "sequence/"
+# Nur zum Debuggen: Aufnahme zusätzlich unter SCREENSHOT_PATH + NAME speichern
+SAVE_SCREENSHOT = False
+
+def capture_region(region):
+    """Nimmt den Bereich (x, y, Breite, Höhe) auf und liefert ihn als RGB-Array"""
+    # pyautogui erst bei der ersten Aufnahme laden (langsamer Import)
+    import pyautogui
+    return np.asarray(pyautogui.screenshot(region=region))
 
 class SnippingTool:
-    def __init__(self):
+    def __init__(self, save_screenshot=SAVE_SCREENSHOT):
         self.start_x = None
         self.start_y = None
         self.rect = None
+        self.save_screenshot = save_screenshot
+
+        # Ergebnis der Aufnahme: RGB-Frame als NumPy-Array, gewählter Bereich
+        # (x, y, Breite, Höhe) für erneute Aufnahmen und Bildschirmgröße (Breite, Höhe)
+        self.frame = None
+        self.region = None
+        self.screen_size = None
+        # perf_counter-Zeitpunkte (Start, Ende) der eigentlichen Aufnahme
+        self.capture_span = None
 
         self.root = tk.Tk()
         self.root.attributes("-fullscreen", True)
@@ -44,13 +62,22 @@ class SnippingTool:
         width, height = x2 - x1, y2 - y1
 
         # Screenshot des ausgewählten Bereichs
-        screenshot = pyautogui.screenshot(region=(int(x1), int(y1), int(width), int(height)))
+        self.region = (int(x1), int(y1), int(width), int(height))
+        import pyautogui
+        start = time.perf_counter()
+        screenshot = pyautogui.screenshot(region=self.region)
+        self.frame = np.asarray(screenshot)
+        self.capture_span = (start, time.perf_counter())
+        self.screen_size = tuple(pyautogui.size())
 
-        screenshot.save(SCREENSHOT_PATH + NAME)
-        print(f"Screenshot gespeichert: " + NAME)
+        if self.save_screenshot:
+            screenshot.save(SCREENSHOT_PATH + NAME)
+            print(f"Screenshot gespeichert: " + NAME)
 
     def run(self):
+        """Startet die Auswahl und liefert den aufgenommenen Frame (oder None)"""
         self.root.mainloop()
+        return self.frame
 
 if __name__ == "__main__":
-    SnippingTool().run()
+    SnippingTool(save_screenshot=True).run()